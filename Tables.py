@@ -1,7 +1,10 @@
-import pdfplumber
 import pandas as pd
 import os
 
+from extraction_cache import cached
+from pdf_session import PDFSession
+from table_prefilter import table_pages
+
 # Folder where PDFs are saved
 pdf_folder = "PBS_PDF_Tables"
 
@@ -22,12 +25,17 @@ for file_name in os.listdir(pdf_folder):
 
         all_tables = []
 
-        with pdfplumber.open(pdf_path) as pdf:
+        with PDFSession(pdf_path) as doc:
+
+            # Loop through the pages that look like they hold a table
+            text_pages, _ = table_pages(doc)
 
-            # Loop through pages
-            for page_number, page in enumerate(pdf.pages, start=1):
+            for page_number in text_pages:
 
-                tables = page.extract_table()
+                tables = cached(
+                    pdf_path, page_number, "pdfplumber", {"method": "extract_table"},
+                    lambda: doc.plumber.pages[page_number - 1].extract_table()
+                )
 
                 if tables:
                     df = pd.DataFrame(tables)
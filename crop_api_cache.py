@@ -0,0 +1,269 @@
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from rate_limiter import RateLimitAdapter, limited_get
+
+# ===============================
+# SETTINGS
+# ===============================
+
+CACHE_FILE = "crop_api_cache.sqlite"
+
+API_PREFIX = "https://na.data.gov.pk/Crops/"
+
+# Seconds a response counts as fresh, per endpoint
+TTLS = {
+    "/Crops/GetCrops": 7 * 86400,       # The crop list almost never changes
+    "/Crops/GetCropList": 7 * 86400,
+    "/Crops/GetYearly": 86400,          # Only the latest fiscal year moves
+}
+DEFAULT_TTL = 3600
+
+# Serve an expired entry at once and refresh it in the background
+STALE_WHILE_REVALIDATE = True
+MAX_STALE = 30 * 86400     # Older entries are refetched before use
+
+REVALIDATE_WORKERS = 4
+
+
+def ttl_for(url):
+    return TTLS.get(urlsplit(url).path, DEFAULT_TTL)
+
+
+def cache_key(url, params=None):
+    """URL with the query string and `params` merged and sorted."""
+
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+
+    if params:
+        items = params.items() if isinstance(params, dict) else params
+        query += [(k, str(v)) for k, v in items if v is not None]
+
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, urlencode(sorted(query)), ""))
+
+
+def cacheable(status, body):
+    """Only good JSON is kept - an HTML error page must not stick for a week."""
+
+    if status != 200 or not body:
+        return False
+
+    try:
+        json.loads(body)
+    except ValueError:
+        return False
+
+    return True
+
+
+# ===============================
+# SQLITE STORE
+# ===============================
+
+class ResponseCache:
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " content_type TEXT,"
+            " body BLOB NOT NULL,"
+            " fetched REAL NOT NULL)"
+        )
+        self.db.commit()
+
+    def get(self, key):
+        """(body, content_type, age in seconds) or None."""
+
+        with self.lock:
+            row = self.db.execute(
+                "SELECT body, content_type, fetched FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        body, content_type, fetched = row
+        return bytes(body), content_type, time.time() - fetched
+
+    def put(self, key, body, content_type=None):
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses (key, content_type, body, fetched) VALUES (?, ?, ?, ?)",
+                (key, content_type, body, time.time())
+            )
+            self.db.commit()
+
+    def lookup(self, key):
+        """
+        ("fresh" | "stale" | "miss", entry). Stale entries are only
+        offered when stale-while-revalidate is on and they are not too old.
+        """
+
+        entry = self.get(key)
+
+        if entry is None:
+            return "miss", None
+
+        age = entry[2]
+
+        if age < ttl_for(key):
+            return "fresh", entry
+
+        if STALE_WHILE_REVALIDATE and age < MAX_STALE:
+            return "stale", entry
+
+        return "miss", entry
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def response_cache():
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
+
+
+# ===============================
+# REQUESTS SESSION INTEGRATION
+# ===============================
+
+def _cached_response(request, body, content_type):
+    response = requests.Response()
+    response.status_code = 200
+    response.reason = "OK"
+    response._content = body
+    response.headers = CaseInsensitiveDict({"Content-Type": content_type or "application/json"})
+    response.url = request.url
+    response.request = request
+    response.encoding = "utf-8"
+    response.from_cache = True
+    return response
+
+
+class CachingAdapter(RateLimitAdapter):
+    """
+    Rate-limited adapter that answers GETs from the SQLite cache while
+    they are fresh, and refetches (in the background, if allowed) once
+    their TTL has passed.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.revalidator = ThreadPoolExecutor(max_workers=REVALIDATE_WORKERS)
+        self.revalidating = set()
+
+    def send(self, request, **kwargs):
+        if request.method != "GET":
+            return super().send(request, **kwargs)
+
+        cache = response_cache()
+        key = cache_key(request.url)
+        state, entry = cache.lookup(key)
+
+        if state == "fresh":
+            return _cached_response(request, entry[0], entry[1])
+
+        if state == "stale":
+            if key not in self.revalidating:
+                self.revalidating.add(key)
+                self.revalidator.submit(self._revalidate, key, request.copy(), kwargs)
+            return _cached_response(request, entry[0], entry[1])
+
+        return self._fetch(key, request, kwargs)
+
+    def _fetch(self, key, request, kwargs):
+        response = super().send(request, **kwargs)
+
+        if cacheable(response.status_code, response.content):
+            response_cache().put(key, response.content, response.headers.get("Content-Type"))
+
+        return response
+
+    def _revalidate(self, key, request, kwargs):
+        try:
+            self._fetch(key, request, kwargs)
+        except requests.RequestException as e:
+            print(f"⚠ Revalidation failed: {request.url}: {e}")
+        finally:
+            self.revalidating.discard(key)
+
+    def close(self):
+        self.revalidator.shutdown(wait=True)
+        super().close()
+
+
+def install_response_cache(session, prefix=API_PREFIX):
+    """Cache (and rate-limit) every GET the session sends under `prefix`."""
+
+    session.mount(prefix, CachingAdapter())
+    return session
+
+
+# ===============================
+# ASYNCIO INTEGRATION
+# ===============================
+
+_revalidations = set()
+
+
+async def _refetch(session, key, url, params):
+    status, body = await limited_get(session, url, params=params)
+
+    if cacheable(status, body):
+        response_cache().put(key, body)
+
+    return status, body
+
+
+async def _revalidate(session, key, url, params):
+    try:
+        await _refetch(session, key, url, params)
+    except Exception as e:
+        print(f"⚠ Revalidation failed: {url}: {e}")
+
+
+async def cached_get(session, url, params=None):
+    """
+    limited_get() through the cache: fresh hits cost nothing, stale hits
+    are returned immediately and refreshed in the background (await
+    finish_revalidation() before the event loop closes).
+    """
+
+    key = cache_key(url, params)
+    state, entry = response_cache().lookup(key)
+
+    if state == "fresh":
+        return 200, entry[0]
+
+    if state == "stale":
+        task = asyncio.ensure_future(_revalidate(session, key, url, params))
+        _revalidations.add(task)
+        task.add_done_callback(_revalidations.discard)
+        return 200, entry[0]
+
+    return await _refetch(session, key, url, params)
+
+
+async def finish_revalidation():
+    if _revalidations:
+        await asyncio.gather(*list(_revalidations))
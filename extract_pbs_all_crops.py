@@ -1,6 +1,12 @@
 import requests
 import pandas as pd
-import time
+
+from crop_api_cache import install_response_cache
+from rate_limiter import install_rate_limiter
+
+# Adapts to the server instead of a fixed delay between requests;
+# crop API responses come from the on-disk cache while fresh
+session = install_response_cache(install_rate_limiter(requests.Session()))
 
 # -------------------------------
 # STEP 1: Get List of All Crops
@@ -8,7 +14,7 @@ import time
 
 def get_all_crops():
     url = "https://na.data.gov.pk/Crops/GetCrops"
-    response = requests.get(url)
+    response = session.get(url)
 
     if response.status_code != 200:
         print("Failed to fetch crops list")
@@ -27,7 +33,7 @@ def get_crop_yearly_data(crop_id):
     url = "https://na.data.gov.pk/Crops/GetYearly"
     params = {"cropId": crop_id}
 
-    response = requests.get(url, params=params)
+    response = session.get(url, params=params)
 
     if response.status_code != 200:
         return []
@@ -61,9 +67,6 @@ def extract_all_crops_data():
                 "Yield": row.get("yield")
             })
 
-        # Small delay to avoid server overload
-        time.sleep(0.2)
-
     # Convert to DataFrame
     df = pd.DataFrame(all_records)
 
@@ -0,0 +1,288 @@
+import os
+import json
+import hashlib
+import time
+import zlib
+import sqlite3
+import threading
+from functools import lru_cache
+from importlib import metadata
+
+import pandas as pd
+
+from page_classifier import page_ranges, parse_ranges
+from page_fingerprint import compare_revisions, document_fingerprints
+from pdf_store import blob_path, document_sha256
+
+# ===============================
+# SETTINGS
+# ===============================
+
+CACHE_FILE = "extraction_cache.sqlite"
+
+ENABLED = True
+
+MISS = object()   # "not cached" - None is a valid result (a page without a table)
+
+# Distribution whose version is part of every key of an engine
+ENGINE_PACKAGES = {
+    "camelot": "camelot-py",
+    "pdfplumber": "pdfplumber",
+    "tabula": "tabula-py",
+    "paddleocr": "paddleocr",
+}
+
+
+@lru_cache(maxsize=None)
+def engine_version(engine):
+    """Version of the extractor - a new release invalidates its cached output."""
+
+    if engine == "tesseract":
+        try:
+            import tesserocr
+            # "tesseract 5.3.0\n leptonica-..."
+            return tesserocr.tesseract_version().split()[1]
+        except Exception:
+            pass
+
+        try:
+            import pytesseract
+            return str(pytesseract.get_tesseract_version())
+        except Exception:
+            return "unknown"
+
+    try:
+        return metadata.version(ENGINE_PACKAGES.get(engine, engine))
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+# ===============================
+# PAGE KEYS
+# ===============================
+
+def page_key(pdf_path, page):
+    """
+    What a cached result is filed under: the page's fingerprint, so an
+    unchanged page of a revised PDF finds the tables of the previous
+    revision. Page ranges ("1-3,5") combine the keys of their pages; a
+    page that cannot be fingerprinted is keyed by document and number.
+    """
+
+    if isinstance(page, str) and not page.isdigit():
+        keys = [page_key(pdf_path, n) for n in parse_ranges(page)]
+        return hashlib.sha256("|".join(keys).encode()).hexdigest()
+
+    page = int(page)
+    fingerprint = page_fingerprints(pdf_path).get(page)
+
+    return fingerprint or f"{document_sha256(pdf_path)}:{page}"
+
+
+def cache_key(pdf_path, page, engine, params=None):
+    """(page key, engine, parameters, engine version)."""
+
+    return (
+        page_key(pdf_path, page),
+        engine,
+        json.dumps(params or {}, sort_keys=True, default=str),
+        engine_version(engine),
+    )
+
+
+# ===============================
+# SQLITE STORE
+# ===============================
+
+class ExtractionCache:
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+
+        self.db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS page_results ("
+            " page_key TEXT NOT NULL,"
+            " engine TEXT NOT NULL,"
+            " params TEXT NOT NULL,"
+            " version TEXT NOT NULL,"
+            " payload BLOB NOT NULL,"
+            " created REAL NOT NULL,"
+            " PRIMARY KEY (page_key, engine, params, version))"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints ("
+            " sha256 TEXT NOT NULL,"
+            " page INTEGER NOT NULL,"
+            " fingerprint TEXT,"
+            " PRIMARY KEY (sha256, page))"
+        )
+        self.db.commit()
+
+    def get(self, key):
+        """The stored result, or MISS."""
+
+        with self.lock:
+            row = self.db.execute(
+                "SELECT payload FROM page_results"
+                " WHERE page_key = ? AND engine = ? AND params = ? AND version = ?",
+                key
+            ).fetchone()
+
+        if row is None:
+            return MISS
+
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key, payload):
+        blob = zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO page_results"
+                " (page_key, engine, params, version, payload, created)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                key + (blob, time.time())
+            )
+            self.db.commit()
+
+    def get_fingerprints(self, sha256):
+        """{page: fingerprint} stored for a document, or None."""
+
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT page, fingerprint FROM fingerprints WHERE sha256 = ?", (sha256,)
+            ).fetchall()
+
+        return dict(rows) if rows else None
+
+    def put_fingerprints(self, sha256, prints):
+        with self.lock:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO fingerprints (sha256, page, fingerprint) VALUES (?, ?, ?)",
+                [(sha256, page, fp) for page, fp in prints.items()]
+            )
+            self.db.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def extraction_cache():
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = ExtractionCache()
+        return _cache
+
+
+# ===============================
+# PAGE FINGERPRINTS
+# ===============================
+
+_prints = {}
+
+
+def page_fingerprints(pdf_path):
+    """
+    {page: fingerprint} of a PDF, computed once per document content
+    and kept alongside the cached results.
+    """
+
+    sha256 = document_sha256(pdf_path)
+
+    if sha256 not in _prints:
+        cache = extraction_cache()
+        prints = cache.get_fingerprints(sha256)
+
+        if prints is None:
+            try:
+                prints = document_fingerprints(pdf_path)
+            except Exception as e:
+                print(f"   ⚠ Could not fingerprint {os.path.basename(pdf_path)}: {e}")
+                prints = {}
+
+            if prints:
+                cache.put_fingerprints(sha256, prints)
+
+        _prints[sha256] = prints
+
+    return _prints[sha256]
+
+
+# ===============================
+# REVISIONS
+# ===============================
+
+def report_revisions(revisions):
+    """
+    Compare each re-issued PDF with its previous revision page by page.
+    Unchanged pages keep their fingerprint, so their cached tables are
+    carried forward and only the changed pages are extracted again.
+    """
+
+    for filepath, old_sha256 in revisions:
+        try:
+            old = page_fingerprints(blob_path(old_sha256))
+            new = page_fingerprints(filepath)
+        except Exception as e:
+            print(f"⚠ Could not compare revisions of {os.path.basename(filepath)}: {e}")
+            continue
+
+        unchanged, changed = compare_revisions(old, new)
+
+        print(
+            f"↻ Revised: {os.path.basename(filepath)} - {len(changed)} of {len(new)} pages changed"
+            + (f" ({page_ranges(changed)})" if changed else "")
+            + f", {len(unchanged)} carried forward"
+        )
+
+
+# ===============================
+# READ-THROUGH HELPERS
+# ===============================
+
+def cached(pdf_path, page, engine, params, compute):
+    """
+    compute()'s result for one page (or page range) of a PDF, served
+    from the cache when the same engine version already ran on the same
+    content with the same parameters. The result must be JSON-able.
+    """
+
+    if not ENABLED:
+        return compute()
+
+    key = cache_key(pdf_path, page, engine, params)
+    cache = extraction_cache()
+
+    payload = cache.get(key)
+    if payload is MISS:
+        payload = compute()
+        cache.put(key, payload)
+
+    return payload
+
+
+def frames_to_grids(frames):
+    """DataFrames -> [{"columns": [...], "data": [[cell, ...], ...]}, ...]."""
+
+    return [
+        json.loads(df.to_json(orient="split", index=False, date_format="iso"))
+        for df in frames
+    ]
+
+
+def grids_to_frames(grids):
+    return [pd.DataFrame(grid["data"], columns=grid["columns"]) for grid in grids]
+
+
+def cached_frames(pdf_path, page, engine, params, compute):
+    """cached() for engines that return a list of DataFrames."""
+
+    return grids_to_frames(
+        cached(pdf_path, page, engine, params, lambda: frames_to_grids(compute()))
+    )
@@ -0,0 +1,178 @@
+import os
+import inspect
+from itertools import groupby
+from operator import itemgetter
+
+import camelot
+
+import page_renderer
+from extraction_cache import ENABLED as CACHE_ENABLED, MISS
+from extraction_cache import cache_key, extraction_cache, frames_to_grids, grids_to_frames
+from pdf_session import PDFSession
+from table_prefilter import table_pages
+from worker_pool import WORKERS, worker_pool
+
+# ===============================
+# SETTINGS
+# ===============================
+
+PAGES_PER_TASK = 2   # Pages a worker takes at a time (keeps IPC low)
+
+# camelot >= 0.11 takes an image `backend` for lattice: render pages
+# in-process with pdfium instead of a Ghostscript subprocess per page
+try:
+    from camelot.parsers import Lattice
+    RENDER_IN_PROCESS = "backend" in inspect.signature(Lattice.__init__).parameters
+except ImportError:
+    RENDER_IN_PROCESS = False
+
+
+# ===============================
+# WORKER TASKS (run in child processes)
+# ===============================
+
+def _plan_pdf(pdf_path):
+    """(pdf, text pages, scanned pages) - the pages worth extracting."""
+
+    try:
+        with PDFSession(pdf_path) as doc:
+            text_pages, scanned_pages = table_pages(doc)
+    except Exception as e:
+        print(f"❌ Could not open {os.path.basename(pdf_path)}: {e}")
+        return pdf_path, [], []
+
+    return pdf_path, text_pages, scanned_pages
+
+
+def _extract_page(task):
+    """
+    Camelot on one page; every worker parses only the page it was given.
+    None on failure, so the error is not cached as "no tables".
+    """
+
+    pdf_path, page, flavor, camelot_kwargs = task
+
+    # Not part of the cache key: the rendering is the same either way
+    if flavor == "lattice" and RENDER_IN_PROCESS and "backend" not in camelot_kwargs:
+        camelot_kwargs = dict(camelot_kwargs, backend=page_renderer.CamelotBackend())
+
+    try:
+        tables = camelot.read_pdf(pdf_path, pages=str(page), flavor=flavor, **camelot_kwargs)
+    except Exception as e:
+        print(f"❌ Camelot Error: {os.path.basename(pdf_path)} page {page}: {e}")
+        return None
+
+    return [table.df for table in tables]
+
+
+# ===============================
+# ENGINE
+# ===============================
+
+def plan_pdfs(pdf_paths, workers=WORKERS):
+    """
+    [(pdf, text pages, scanned pages), ...] in input order, with the
+    page scoring of each PDF done in parallel.
+    """
+
+    pdf_paths = list(pdf_paths)
+
+    if workers <= 1 or len(pdf_paths) <= 1:
+        return [_plan_pdf(path) for path in pdf_paths]
+
+    return list(worker_pool(workers).map(_plan_pdf, pdf_paths))
+
+
+def extract_tables(plans, flavor="lattice", workers=WORKERS, **camelot_kwargs):
+    """
+    Run Camelot over the text pages of every plan, one page per task,
+    spread across `workers` processes.
+
+    Yields (pdf, page, table number, DataFrame) in (pdf, page, table)
+    order; table numbers count from 1 within each PDF, like enumerating
+    one multi-page camelot.read_pdf() result. Pages already in the
+    extraction cache are not sent to a worker.
+    """
+
+    tasks = [
+        (pdf_path, page, flavor, camelot_kwargs)
+        for pdf_path, text_pages, _ in plans
+        for page in text_pages
+    ]
+
+    if not tasks:
+        return
+
+    params = dict(camelot_kwargs, flavor=flavor)
+    keys = [None] * len(tasks)
+    cached = {}
+
+    if CACHE_ENABLED:
+        cache = extraction_cache()
+
+        for i, (pdf_path, page, _, _) in enumerate(tasks):
+            keys[i] = cache_key(pdf_path, page, "camelot", params)
+            payload = cache.get(keys[i])
+            if payload is not MISS:
+                cached[i] = grids_to_frames(payload)
+
+    misses = [task for i, task in enumerate(tasks) if i not in cached]
+
+    print(f"🚀 Camelot on {len(misses)} pages ({workers} processes), {len(cached)} from cache...")
+
+    in_process = workers <= 1 or len(misses) <= 1
+
+    if in_process:
+        results = map(_extract_page, misses)
+    else:
+        # The warm workers shared with OCR: no new pool per document
+        results = worker_pool(workers).map(_extract_page, misses, chunksize=PAGES_PER_TASK)
+
+    try:
+        numbers = {}
+
+        # map() hands results back in task order, whichever worker finishes first
+        for i, (pdf_path, page, _, _) in enumerate(tasks):
+
+            if i in cached:
+                frames = cached[i]
+            else:
+                frames = next(results)
+
+                if frames is None:
+                    continue
+                if keys[i] is not None:
+                    cache.put(keys[i], frames_to_grids(frames))
+
+            for df in frames:
+                numbers[pdf_path] = numbers.get(pdf_path, 0) + 1
+                yield pdf_path, page, numbers[pdf_path], df
+
+    finally:
+        if not in_process:
+            # Drops the pages not started yet; the pool stays up
+            results.close()
+
+
+def extract_tables_by_pdf(plans, flavor="lattice", workers=WORKERS, **camelot_kwargs):
+    """
+    extract_tables() one document at a time: yields (plan, [(page,
+    table number, DataFrame), ...]) for every plan, in plan order, as
+    soon as that PDF is done - with an empty list for a PDF without
+    tables, so it can still be recorded.
+    """
+
+    plans = list(plans)
+
+    tables = groupby(extract_tables(plans, flavor, workers, **camelot_kwargs), key=itemgetter(0))
+    group = next(tables, None)
+
+    for plan in plans:
+
+        found = []
+
+        if group is not None and group[0] == plan[0]:
+            found = [(page, number, df) for _, page, number, df in group[1]]
+            group = next(tables, None)
+
+        yield plan, found
@@ -0,0 +1,550 @@
+import os
+import csv
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlencode, urljoin, urlsplit
+
+from http_fetch import FIXTURE_ENV
+
+# ===============================
+# SETTINGS
+# ===============================
+
+FIXTURE_FOLDER = "HTTP_Fixtures"
+BODY_FOLDER = os.path.join(FIXTURE_FOLDER, "bodies")
+INDEX_FILE = os.path.join(FIXTURE_FOLDER, "index.json")
+
+DEFAULT_PORT = 8800
+CHUNK_SIZE = 16 * 1024    # Bytes written between bandwidth sleeps
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+}
+
+PBS_AGRI_URL = "https://www.pbs.gov.pk/agriculture-sector-of-pakistan-importance-role-key-statistics/"
+PBS_CENSUS_URL = "https://www.pbs.gov.pk/agriculture-census/"
+MNFSR_URL = "https://mnfsr.gov.pk/Publications"
+CROPS_HOME_URL = "https://na.data.gov.pk/Crops/Home"
+CROPS_URL = "https://na.data.gov.pk/Crops/GetCrops"
+YEARLY_URL = "https://na.data.gov.pk/Crops/GetYearly"
+
+# Synthetic crop API (no real responses were ever captured in the repo)
+FIXTURE_CROPS = [
+    "Wheat", "Rice", "Cotton", "Sugarcane", "Maize", "Gram", "Barley",
+    "Jowar", "Bajra", "Potato", "Onion", "Mango", "Citrus", "Rapeseed",
+]
+FIXTURE_YEARS = range(2000, 2024)
+
+# Explicit, or clients fall back to ISO-8859-1 and garble the titles
+HTML = "text/html; charset=utf-8"
+
+
+# ===============================
+# FIXTURE KEYS
+# ===============================
+
+def fixture_key(method, url, body=None):
+    """Lookup key: method, host, path and sorted query (+ body hash)."""
+
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+
+    key = f"{method.upper()} {parts.netloc}{unquote(parts.path) or '/'}"
+    if query:
+        key += f"?{query}"
+    if body:
+        key += f" #{hashlib.sha1(body).hexdigest()[:16]}"
+
+    return key
+
+
+# ===============================
+# FIXTURE STORE
+# ===============================
+
+class FixtureStore:
+    """
+    Captured responses. Bodies live in HTTP_Fixtures/bodies, except for
+    PDFs already in the repo, which are served from where they are.
+    """
+
+    def __init__(self, index_file=INDEX_FILE):
+        self.index_file = index_file
+        self.entries = {}
+        self.lock = threading.Lock()
+
+        if os.path.exists(index_file):
+            with open(index_file, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
+        tmp = self.index_file + ".tmp"
+
+        with self.lock, open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+
+        os.replace(tmp, self.index_file)
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def add_body(self, method, url, body, content_type, status=200,
+                 etag=None, last_modified=None, request_body=None):
+
+        digest = hashlib.sha1(body).hexdigest()
+        path = os.path.join(BODY_FOLDER, f"{digest}.bin")
+
+        os.makedirs(BODY_FOLDER, exist_ok=True)
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(body)
+
+        return self._add(method, url, request_body, {
+            "url": url,
+            "status": status,
+            "content_type": content_type,
+            "file": path,
+            "etag": etag or f'"{digest[:16]}"',
+            "last_modified": last_modified or formatdate(usegmt=True),
+        })
+
+    def add_file(self, url, path, content_type="application/pdf"):
+        stat = os.stat(path)
+        tag = hashlib.sha1(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()
+
+        return self._add("GET", url, None, {
+            "url": url,
+            "status": 200,
+            "content_type": content_type,
+            "file": path,
+            "etag": f'"{tag[:16]}"',
+            "last_modified": formatdate(stat.st_mtime, usegmt=True),
+        })
+
+    def _add(self, method, url, request_body, entry):
+        key = fixture_key(method, url, request_body)
+
+        with self.lock:
+            self.entries[key] = entry
+
+        return key
+
+
+# ===============================
+# RECORD (live hosts -> fixtures)
+# ===============================
+
+def record(store, method, url, body=None, headers=None):
+    """Fetch `url` from the live host once and keep the response."""
+
+    import requests
+
+    r = requests.request(method, url, data=body, headers=dict(HEADERS, **(headers or {})), timeout=120)
+
+    key = store.add_body(
+        method, url, r.content,
+        content_type=r.headers.get("Content-Type", "application/octet-stream"),
+        status=r.status_code,
+        etag=r.headers.get("ETag"),
+        last_modified=r.headers.get("Last-Modified"),
+        request_body=body,
+    )
+
+    print(f"🎥 Recorded {r.status_code}: {url} ({len(r.content)} bytes)")
+    return key
+
+
+# ===============================
+# SEED FROM FILES ALREADY IN THE REPO
+# ===============================
+
+def _page(title, body):
+    return (
+        f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{title}</title></head>'
+        f"<body>{body}</body></html>"
+    ).encode("utf-8")
+
+
+def _anchor_list(links):
+    return "\n".join(f'<a href="{url}">{title}</a>' for title, url in links)
+
+
+def _read_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))[1:]
+
+
+def seed_from_repo(store):
+    """
+    Build fixtures offline from the link catalogs and PDFs in the repo:
+    PBS listings -> Table_*.pdf / Census_*.pdf, MNFSR publications ->
+    the MNFSR PDFs by name, plus a synthetic crop API.
+    """
+
+    # PBS agriculture page; hello.py saved its PDFs as Table_1..N
+    links = _read_rows("pbs_agri_links.csv")
+    store.add_body("GET", PBS_AGRI_URL, _page("PBS Agriculture", _anchor_list(links)), HTML)
+
+    pdfs = list(dict.fromkeys(url for _, url in links if url.endswith(".pdf")))
+    for i, url in enumerate(pdfs, start=1):
+        if os.path.exists(f"Table_{i}.pdf"):
+            store.add_file(url, f"Table_{i}.pdf")
+
+    # PBS agriculture census page -> Census_1..N
+    links = _read_rows("pbs_agri_census_links.csv")
+    store.add_body("GET", PBS_CENSUS_URL, _page("Agriculture Census", _anchor_list(links)), HTML)
+
+    pdfs = sorted({urljoin(PBS_CENSUS_URL, url) for _, url in links if ".pdf" in url.lower()})
+    for i, url in enumerate(pdfs, start=1):
+        if os.path.exists(f"Census_{i}.pdf"):
+            store.add_file(url, f"Census_{i}.pdf")
+
+    # MNFSR publications table -> PDFs of the same name
+    rows = _read_rows("MNFSR_Publications_List.csv")
+    table = "<table><tr><th>#</th><th>Title</th><th>Date</th><th>Download</th></tr>" + "".join(
+        f'<tr><td>{i}</td><td>{title}</td><td>{date}</td><td><a href="{link}">Download</a></td></tr>'
+        for i, (title, date, link) in enumerate(rows, start=1)
+    ) + "</table>"
+    store.add_body("GET", MNFSR_URL, _page("Publications", table), HTML)
+
+    for _, _, link in rows:
+        name = unquote(link.split("/")[-1])
+        if link and os.path.exists(name):
+            store.add_file(link, name)
+
+    seed_crop_api(store)
+    store.save()
+
+    print(f"🌱 Seeded {len(store.entries)} fixtures into {FIXTURE_FOLDER}")
+
+
+def seed_crop_api(store):
+    crops = [{"cropId": i, "cropName": name} for i, name in enumerate(FIXTURE_CROPS, start=1)]
+    store.add_body("GET", CROPS_URL, json.dumps(crops).encode(), "application/json")
+
+    for crop in crops:
+        rng = random.Random(crop["cropId"])
+        area = rng.uniform(50, 9000)
+
+        rows = []
+        for year in FIXTURE_YEARS:
+            area *= rng.uniform(0.95, 1.06)
+            crop_yield = rng.uniform(500, 4000)
+            rows.append({
+                "fiscalyear": f"{year}-{str(year + 1)[-2:]}",
+                "area": round(area, 1),
+                "production": round(area * crop_yield / 1000, 1),
+                "yield": round(crop_yield),
+            })
+
+        url = f"{YEARLY_URL}?{urlencode({'cropId': crop['cropId']})}"
+        store.add_body("GET", url, json.dumps(rows).encode(), "application/json")
+
+    options = lambda select_id, values: (
+        f'<select id="{select_id}"><option value="">Select</option>'
+        + "".join(f'<option value="{v}">{t}</option>' for v, t in values)
+        + "</select>"
+    )
+    home = options("CropId", [(c["cropId"], c["cropName"]) for c in crops]) + options(
+        "YearId", [(y, f"{y}-{str(y + 1)[-2:]}") for y in FIXTURE_YEARS]
+    ) + '<table id="tblCropData"></table>'
+
+    store.add_body("GET", CROPS_HOME_URL, _page("Crops", home), HTML)
+
+
+# ===============================
+# SERVER
+# ===============================
+
+class FaultProfile:
+    """Latency, bandwidth and error injection, reproducible per seed."""
+
+    def __init__(self, latency=0.0, jitter=0.0, bandwidth=None, error_rate=0.0,
+                 error_status=503, retry_after=1, truncate_rate=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.truncate_rate = truncate_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def roll(self):
+        with self.lock:
+            return self.rng.random(), self.rng.random(), self.rng.uniform(0, self.jitter)
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, store, faults, record_misses=False):
+        super().__init__(address, FixtureHandler)
+        self.store = store
+        self.faults = faults
+        self.record_misses = record_misses
+        self.stats = {
+            "requests": 0, "bytes_sent": 0, "not_modified": 0, "partial": 0,
+            "errors_injected": 0, "truncated": 0, "misses": 0,
+        }
+        self.stats_lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, name, amount=1):
+        with self.stats_lock:
+            self.stats[name] += amount
+
+
+def _parse_range(value, size):
+    """(start, end) for a single 'bytes=' range, None if absent, False if unsatisfiable."""
+
+    if not value or not value.startswith("bytes=") or "," in value:
+        return None
+
+    first, _, last = value[6:].strip().partition("-")
+
+    try:
+        if not first:
+            start, end = max(0, size - int(last)), size - 1
+        else:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+    except ValueError:
+        return None
+
+    if start >= size or start > end:
+        return False
+
+    return start, end
+
+
+def _not_modified(headers, entry):
+    if headers.get("If-None-Match"):
+        tags = [t.strip().removeprefix("W/") for t in headers["If-None-Match"].split(",")]
+        return entry["etag"] in tags or "*" in tags
+
+    if headers.get("If-Modified-Since") and entry.get("last_modified"):
+        try:
+            since = parsedate_to_datetime(headers["If-Modified-Since"])
+            return parsedate_to_datetime(entry["last_modified"]) <= since
+        except (TypeError, ValueError):
+            return False
+
+    return False
+
+
+def _range_applies(headers, entry):
+    """If-Range: the Range only holds while the validator still matches."""
+
+    if_range = headers.get("If-Range")
+
+    if not if_range:
+        return True
+
+    return if_range in (entry["etag"], entry.get("last_modified"))
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._serve()
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self._serve(request_body=self.rfile.read(length))
+
+    def log_message(self, format, *args):
+        pass
+
+    # -------------------------------
+
+    def _serve(self, send_body=True, request_body=None):
+        server = self.server
+        faults = server.faults
+        server.count("requests")
+
+        if self.path == "/__stats__":
+            return self._send(200, json.dumps(server.stats).encode(), "application/json")
+
+        # /<host>/<path> -> https://<host>/<path>
+        host, _, rest = self.path.lstrip("/").partition("/")
+        url = f"https://{host}/{rest}"
+        method = "GET" if self.command == "HEAD" else self.command
+        key = fixture_key(method, url, request_body)
+
+        error_roll, truncate_roll, delay = faults.roll()
+        time.sleep(faults.latency + delay)
+
+        if error_roll < faults.error_rate:
+            server.count("errors_injected")
+            return self._send(faults.error_status, b"injected error", "text/plain",
+                              {"Retry-After": str(faults.retry_after)})
+
+        entry = server.store.get(key)
+
+        if entry is None and server.record_misses:
+            try:
+                key = record(server.store, method, url, request_body)
+                server.store.save()
+                entry = server.store.get(key)
+            except Exception as e:
+                print(f"❌ Record failed: {url}: {e}")
+
+        if entry is None:
+            server.count("misses")
+            return self._send(404, f"no fixture for {key}".encode(), "text/plain")
+
+        headers = {"ETag": entry["etag"], "Accept-Ranges": "bytes"}
+        if entry.get("last_modified"):
+            headers["Last-Modified"] = entry["last_modified"]
+
+        if entry["status"] == 200 and _not_modified(self.headers, entry):
+            server.count("not_modified")
+            return self._send(304, b"", None, headers)
+
+        with open(entry["file"], "rb") as f:
+            body = f.read()
+
+        status = entry["status"]
+        byte_range = None
+        if status == 200 and _range_applies(self.headers, entry):
+            byte_range = _parse_range(self.headers.get("Range"), len(body))
+
+        if byte_range is False:
+            headers["Content-Range"] = f"bytes */{len(body)}"
+            return self._send(416, b"", None, headers)
+
+        if byte_range:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(body)}"
+            body, status = body[start:end + 1], 206
+            server.count("partial")
+
+        truncate = truncate_roll < faults.truncate_rate and len(body) > 1
+        self._send(status, body, entry["content_type"], headers, send_body, truncate)
+
+    def _send(self, status, body, content_type, headers=None, send_body=True, truncate=False):
+        self.send_response(status)
+
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+
+        if truncate:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+
+        self.end_headers()
+
+        if not send_body or not body:
+            return
+
+        if truncate:
+            # Promise the full length, then drop the connection halfway
+            body = body[:len(body) // 2]
+            self.server.count("truncated")
+
+        bandwidth = self.server.faults.bandwidth
+
+        for start in range(0, len(body), CHUNK_SIZE):
+            chunk = body[start:start + CHUNK_SIZE]
+            try:
+                self.wfile.write(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                return
+
+            self.server.count("bytes_sent", len(chunk))
+
+            if bandwidth:
+                time.sleep(len(chunk) / bandwidth)
+
+
+def start_server(port=0, record_misses=False, **faults):
+    """
+    Serve the fixtures from a background thread and point this process
+    (PIPELINE_FIXTURE_URL) at them. Returns the running server.
+    """
+
+    server = FixtureServer(("127.0.0.1", port), FixtureStore(), FaultProfile(**faults), record_misses)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ[FIXTURE_ENV] = server.base_url
+    return server
+
+
+# ===============================
+# COMMAND LINE
+# ===============================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record/replay HTTP fixtures for offline pipeline runs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("seed", help="build fixtures from the catalogs and PDFs in the repo")
+
+    rec = commands.add_parser("record", help="capture live URLs")
+    rec.add_argument("urls", nargs="+")
+
+    serve = commands.add_parser("serve", help="serve the fixtures")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    serve.add_argument("--jitter", type=float, default=0.0, help="extra random latency, up to this many seconds")
+    serve.add_argument("--bandwidth", type=float, default=None, help="bytes per second per response")
+    serve.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with --error-status")
+    serve.add_argument("--error-status", type=int, default=503)
+    serve.add_argument("--truncate-rate", type=float, default=0.0, help="fraction of bodies cut off halfway")
+    serve.add_argument("--seed", type=int, default=0)
+    serve.add_argument("--record", action="store_true", help="fetch and keep live responses on a miss")
+
+    args = parser.parse_args(argv)
+    store = FixtureStore()
+
+    if args.command == "seed":
+        seed_from_repo(store)
+
+    elif args.command == "record":
+        for url in args.urls:
+            record(store, "GET", url)
+        store.save()
+
+    else:
+        faults = FaultProfile(
+            latency=args.latency, jitter=args.jitter, bandwidth=args.bandwidth,
+            error_rate=args.error_rate, error_status=args.error_status,
+            truncate_rate=args.truncate_rate, seed=args.seed,
+        )
+        server = FixtureServer(("127.0.0.1", args.port), store, faults, args.record)
+
+        print(f"🧪 Serving {len(store.entries)} fixtures on {server.base_url}")
+        print(f"   export {FIXTURE_ENV}={server.base_url}")
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            print(f"\n📊 {json.dumps(server.stats)}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
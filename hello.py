@@ -1,39 +1,42 @@
-import requests
-from bs4 import BeautifulSoup
 import os
 
-url = "https://www.pbs.gov.pk/agriculture-sector-of-pakistan-importance-role-key-statistics/"
+from pdf_downloader import download_pdfs
+from pdf_store import document_sha256, link_blob
+from publications_crawler import catalog_links, crawl, load_state
 
 # Folder to save PDFs
 folder = "PBS_PDF_Tables"
 os.makedirs(folder, exist_ok=True)
 
-print("Connecting to PBS page...")
+print("Crawling PBS page...")
 
-response = requests.get(url)
-soup = BeautifulSoup(response.text, "html.parser")
+crawl(["pbs_agri"])
 
-pdf_count = 0
+pdf_links = []
 
-for link in soup.find_all("a"):
-    href = link.get("href")
-    title = link.get_text(strip=True)
+for title, href in catalog_links(load_state(), "pbs_agri"):
 
-    if href and href.endswith(".pdf"):
+    if href.endswith(".pdf"):
+        print(f"Found PDF {len(pdf_links) + 1}: {title}")
+        pdf_links.append(href)
 
-        # Fix relative URLs
-        if href.startswith("/"):
-            href = "https://www.pbs.gov.pk" + href
+# Numbered in page order, repeated links included, so Table_N keeps
+# naming the same document it always did
+filenames = [f"Table_{i}.pdf" for i in range(1, len(pdf_links) + 1)]
 
-        pdf_count += 1
-        print(f"Downloading PDF {pdf_count}: {title}")
+# Each URL is fetched once, under its first name...
+first = {}
+for href, name in zip(pdf_links, filenames):
+    first.setdefault(href, name)
 
-        pdf_data = requests.get(href)
+download_pdfs(list(first), folder, filenames=list(first.values()), skip_existing=False)
 
-        file_path = os.path.join(folder, f"Table_{pdf_count}.pdf")
+# ...and its repeats point at the same stored file
+for href, name in zip(pdf_links, filenames):
+    source = os.path.join(folder, first[href])
 
-        with open(file_path, "wb") as f:
-            f.write(pdf_data.content)
+    if name != first[href] and os.path.exists(source):
+        link_blob(document_sha256(source), os.path.join(folder, name))
 
 print("\n✅ All PDFs downloaded successfully!")
 print("Saved inside folder:", folder)
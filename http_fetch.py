@@ -0,0 +1,34 @@
+import os
+from urllib.parse import urlsplit
+
+# ===============================
+# SETTINGS
+# ===============================
+
+# When set (e.g. http://127.0.0.1:8800) every live URL is served by
+# the fixture server instead of the real host
+FIXTURE_ENV = "PIPELINE_FIXTURE_URL"
+
+
+# ===============================
+# URL REWRITING
+# ===============================
+
+def resolve_url(url):
+    """
+    `url` unchanged, or - when PIPELINE_FIXTURE_URL is set - the same
+    resource on the fixture server: https://host/path -> <base>/host/path
+    """
+
+    base = os.environ.get(FIXTURE_ENV)
+
+    if not base:
+        return url
+
+    parts = urlsplit(url)
+
+    if parts.scheme not in ("http", "https") or parts.netloc == urlsplit(base).netloc:
+        return url
+
+    target = f"{base.rstrip('/')}/{parts.netloc}{parts.path or '/'}"
+    return f"{target}?{parts.query}" if parts.query else target
@@ -0,0 +1,280 @@
+import io
+import os
+import shutil
+import tempfile
+
+import requests
+from pypdf import PageObject, PdfReader, PdfWriter
+from pypdf.errors import PdfReadError
+from pypdf.generic import NameObject
+
+from http_fetch import resolve_url
+
+# ===============================
+# SETTINGS
+# ===============================
+
+BLOCK_SIZE = 64 * 1024            # Bytes fetched per Range block
+TAIL_BLOCKS = 2                   # Trailer + xref usually sit in the last blocks
+SPOOL_LIMIT = 32 * 1024 * 1024    # Fallback downloads spill to disk past this
+
+# Page attributes a /Page may inherit from its /Pages ancestors
+INHERITABLE = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+    "Accept-Encoding": "identity",
+}
+
+
+# ===============================
+# RANGE-BACKED FILE OBJECT
+# ===============================
+
+class HTTPRangeFile(io.RawIOBase):
+    """
+    Read-only, seekable file object over a remote PDF.
+
+    Bytes are fetched lazily with HTTP Range requests in BLOCK_SIZE
+    blocks and kept in memory, so a parser only pulls the blocks it
+    seeks to. Servers without Range support get one plain download
+    instead.
+    """
+
+    def __init__(self, url, session=None, block_size=BLOCK_SIZE):
+        super().__init__()
+
+        self.url = resolve_url(url)
+        self.session = session or requests.Session()
+        self.block_size = block_size
+
+        self.blocks = {}
+        self.position = 0
+        self.bytes_fetched = 0
+        self.fallback = None
+
+        self._probe()
+
+    # -------------------------------
+    # Setup
+    # -------------------------------
+
+    def _probe(self):
+        r = self.session.get(
+            self.url,
+            headers=dict(HEADERS, Range=f"bytes=0-{self.block_size - 1}"),
+            stream=True
+        )
+        r.raise_for_status()
+
+        if r.status_code == 206 and "/" in r.headers.get("Content-Range", ""):
+            self.size = int(r.headers["Content-Range"].rpartition("/")[2])
+            self._store(0, r.content)
+            self._prefetch_tail()
+            return
+
+        # Range not supported: spool the whole body once
+        print(f"⚠ No Range support, full download: {self.url}")
+
+        self.fallback = tempfile.SpooledTemporaryFile(max_size=SPOOL_LIMIT)
+        shutil.copyfileobj(r.raw, self.fallback)
+        self.size = self.fallback.tell()
+        self.bytes_fetched = self.size
+        self.fallback.seek(0)
+
+    def _prefetch_tail(self):
+        first = max(0, (self.size - 1) // self.block_size - TAIL_BLOCKS + 1)
+        last = (self.size - 1) // self.block_size
+        self._fetch_blocks(first, last)
+
+    # -------------------------------
+    # Block cache
+    # -------------------------------
+
+    def _store(self, start, data):
+        for i in range(0, len(data), self.block_size):
+            self.blocks[(start + i) // self.block_size] = data[i:i + self.block_size]
+        self.bytes_fetched += len(data)
+
+    def _fetch_blocks(self, first, last):
+        # Merge the missing blocks into as few requests as possible
+        missing = [b for b in range(first, last + 1) if b not in self.blocks]
+
+        while missing:
+            run_start = run_end = missing.pop(0)
+            while missing and missing[0] == run_end + 1:
+                run_end = missing.pop(0)
+
+            start = run_start * self.block_size
+            end = min(self.size, (run_end + 1) * self.block_size) - 1
+
+            r = self.session.get(self.url, headers=dict(HEADERS, Range=f"bytes={start}-{end}"))
+            r.raise_for_status()
+
+            if r.status_code != 206:
+                raise IOError(f"Range request ignored for {self.url}")
+
+            self._store(start, r.content)
+
+    # -------------------------------
+    # io.RawIOBase interface
+    # -------------------------------
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_SET:
+            self.position = offset
+        elif whence == os.SEEK_CUR:
+            self.position += offset
+        elif whence == os.SEEK_END:
+            self.position = self.size + offset
+        else:
+            raise ValueError(f"invalid whence: {whence}")
+
+        self.position = max(0, self.position)
+        return self.position
+
+    def readinto(self, buffer):
+        end = min(self.size, self.position + len(buffer))
+
+        if end <= self.position:
+            return 0
+
+        if self.fallback is not None:
+            self.fallback.seek(self.position)
+            data = self.fallback.read(end - self.position)
+        else:
+            first = self.position // self.block_size
+            last = (end - 1) // self.block_size
+            self._fetch_blocks(first, last)
+
+            data = b"".join(self.blocks[b] for b in range(first, last + 1))
+            offset = self.position - first * self.block_size
+            data = data[offset:offset + end - self.position]
+
+        buffer[:len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+    def close(self):
+        if self.fallback is not None:
+            self.fallback.close()
+        self.blocks.clear()
+        super().close()
+
+
+def open_remote_pdf(url, session=None):
+    """
+    Buffered, seekable handle on a remote PDF. Works with pypdf,
+    pdfminer and pdfplumber.open(), but pdfminer resolves every page
+    dictionary on open - use fetch_pages() when only a few pages are
+    wanted.
+    """
+
+    return io.BufferedReader(HTTPRangeFile(url, session), buffer_size=BLOCK_SIZE)
+
+
+def open_reader(raw):
+    """
+    pypdf reader over a range file. Non-strict pypdf seeks to every
+    object in the xref to validate it - i.e. reads the whole file - so
+    strict parsing is tried first and the lenient one only used for
+    PDFs with a broken xref.
+    """
+
+    try:
+        return PdfReader(io.BufferedReader(raw, buffer_size=BLOCK_SIZE), strict=True)
+    except PdfReadError:
+        raw.seek(0)
+        return PdfReader(io.BufferedReader(raw, buffer_size=BLOCK_SIZE))
+
+
+def _walk_pages(ref, offset, first_page, last_page, inherited):
+    node = ref.get_object()
+
+    if "/Kids" not in node:
+        if first_page <= offset + 1 <= last_page:
+            page = PageObject(ref.pdf, ref)
+            page.update(node)
+            for key, value in inherited.items():
+                if key not in page:
+                    page[NameObject(key)] = value
+            yield page
+        return
+
+    inherited = dict(inherited)
+    for key in INHERITABLE:
+        if key in node:
+            inherited[key] = node.raw_get(key)
+
+    for kid in node["/Kids"]:
+        if offset >= last_page:
+            return
+
+        kid_node = kid.get_object()
+        count = int(kid_node.get("/Count", 1)) if "/Kids" in kid_node else 1
+
+        # Whole subtrees before first_page are skipped unread
+        if offset + count >= first_page:
+            yield from _walk_pages(kid, offset, first_page, last_page, inherited)
+
+        offset += count
+
+
+def iter_pages(reader, first_page, last_page):
+    """
+    Pages first_page..last_page (1-based) without flattening the whole
+    page tree. reader.pages resolves every /Page dictionary, and those
+    are spread over the entire file.
+    """
+
+    pages_ref = reader.trailer["/Root"].get_object().raw_get("/Pages")
+    yield from _walk_pages(pages_ref, 0, first_page, last_page, {})
+
+
+def page_count(reader):
+    return int(reader.trailer["/Root"].get_object()["/Pages"]["/Count"])
+
+
+# ===============================
+# PAGE SUBSET DOWNLOAD
+# ===============================
+
+def fetch_pages(url, out_path, first_page=1, last_page=None, session=None):
+    """
+    Write only pages first_page..last_page of a remote PDF to `out_path`
+    (a small local PDF camelot / tabula can open). Returns the number of
+    pages written and the bytes actually transferred.
+    """
+
+    raw = HTTPRangeFile(url, session)
+
+    try:
+        reader = open_reader(raw)
+
+        total = page_count(reader)
+        last_page = total if last_page is None else min(last_page, total)
+
+        writer = PdfWriter()
+        for page in iter_pages(reader, first_page, last_page):
+            writer.add_page(page)
+
+        tmp = out_path + ".tmp"
+        with open(tmp, "wb") as f:
+            writer.write(f)
+        os.replace(tmp, out_path)
+
+        # Not last_page - first_page + 1: a /Count that overstates the
+        # tree, or a range past the end, writes fewer pages
+        return len(writer.pages), raw.bytes_fetched
+
+    finally:
+        raw.close()
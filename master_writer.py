@@ -0,0 +1,173 @@
+import os
+import json
+import shutil
+
+import pandas as pd
+
+from pdf_store import document_sha256
+
+# ===============================
+# SETTINGS
+# ===============================
+
+PARTS_SUFFIX = ".parts"      # <master>.parts/ holds one chunk per PDF
+MANIFEST_FILE = "manifest.json"
+COMMIT_ROWS = 50_000         # Rows streamed at a time while committing
+
+
+def _unique(columns):
+    """Column names as strings, repeats suffixed (.1, .2 ...) like pandas does."""
+
+    seen = {}
+    names = []
+
+    for column in map(str, columns):
+        if column in seen:
+            seen[column] += 1
+            names.append(f"{column}.{seen[column]}")
+        else:
+            seen[column] = 0
+            names.append(column)
+
+    return names
+
+
+def _replace_json(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+# ===============================
+# MASTER WRITER
+# ===============================
+
+class MasterWriter:
+    """
+    A master CSV built one PDF at a time.
+
+    Each PDF's tables are written to their own chunk as soon as they are
+    extracted, so only one PDF is ever held in memory. New columns are
+    added to the schema as they appear. commit() streams the chunks
+    under the final header into the master file and swaps it in
+    atomically; until then the previous master is untouched.
+
+    Chunks outlive a crash: the next run of the same `extractor`
+    resumes, and has() tells which PDFs are already written. PDFs are
+    known by content, so a re-downloaded revision is extracted again.
+    Chunks left by a different extractor writing the same master file
+    are discarded, never mixed in.
+    """
+
+    def __init__(self, path, extractor, resume=True):
+        self.path = path
+        self.extractor = extractor
+        self.parts = path + PARTS_SUFFIX
+        self.manifest_path = os.path.join(self.parts, MANIFEST_FILE)
+
+        self.manifest = None
+        if resume and os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+
+            if self.manifest.get("extractor") != extractor:
+                print(f"⚠ {self.parts} was left by {self.manifest.get('extractor') or 'another extractor'}: starting fresh")
+                self.manifest = None
+
+        if self.manifest is None:
+            shutil.rmtree(self.parts, ignore_errors=True)
+            self.manifest = {"extractor": extractor, "columns": [], "chunks": []}
+
+        os.makedirs(self.parts, exist_ok=True)
+
+        self.sources = {chunk["source"] for chunk in self.manifest["chunks"]}
+
+        if self.sources:
+            print(f"↻ Resuming {path}: {len(self.sources)} PDFs already written")
+
+    @property
+    def columns(self):
+        return self.manifest["columns"]
+
+    @property
+    def rows(self):
+        return sum(chunk["rows"] for chunk in self.manifest["chunks"])
+
+    def has(self, pdf_path):
+        return document_sha256(pdf_path) in self.sources
+
+    def write(self, pdf_path, frames):
+        """Append one PDF's tables. Returns the rows written."""
+
+        frames = [df for df in frames if df is not None]
+
+        source = document_sha256(pdf_path)
+
+        chunk = {
+            "source": source,
+            "name": os.path.basename(pdf_path),
+            "file": None,
+            "columns": [],
+            "rows": 0,
+        }
+
+        if frames:
+            df = pd.concat(frames, ignore_index=True)
+            df.columns = _unique(df.columns)
+
+            chunk["file"] = f"{len(self.manifest['chunks']):05d}.csv"
+            chunk["columns"] = list(df.columns)
+            chunk["rows"] = len(df)
+
+            path = os.path.join(self.parts, chunk["file"])
+            df.to_csv(path + ".tmp", index=False, header=False)
+            os.replace(path + ".tmp", path)
+
+            for column in df.columns:
+                if column not in self.columns:
+                    self.columns.append(column)
+
+        # A chunk only counts once the manifest says so
+        self.manifest["chunks"].append(chunk)
+        _replace_json(self.manifest_path, self.manifest)
+        self.sources.add(source)
+
+        return chunk["rows"]
+
+    def commit(self):
+        """
+        Write the master file (atomically) and drop the chunks.
+        Returns the rows written - 0 leaves any previous master alone.
+        """
+
+        rows = self.rows
+
+        if rows:
+            tmp = self.path + ".tmp"
+
+            pd.DataFrame(columns=self.columns).to_csv(tmp, index=False)
+
+            for chunk in self.manifest["chunks"]:
+                if not chunk["file"]:
+                    continue
+
+                parts = pd.read_csv(
+                    os.path.join(self.parts, chunk["file"]),
+                    header=None,
+                    names=chunk["columns"],
+                    dtype=str,
+                    keep_default_na=False,
+                    chunksize=COMMIT_ROWS
+                )
+
+                for part in parts:
+                    part.reindex(columns=self.columns, fill_value="").to_csv(
+                        tmp, mode="a", index=False, header=False
+                    )
+
+            os.replace(tmp, self.path)
+
+        shutil.rmtree(self.parts, ignore_errors=True)
+
+        return rows
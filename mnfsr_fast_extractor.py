@@ -1,16 +1,23 @@
 import os
 import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import camelot
 from concurrent.futures import ThreadPoolExecutor
 
-BASE_URL = "https://mnfsr.gov.pk/Publications"
+from extraction_cache import report_revisions
+from extraction_engine import extract_tables_by_pdf, plan_pdfs
+from http_range_file import fetch_pages
+from master_writer import MasterWriter
+from pdf_downloader import download_pdfs, unique_filenames
+from pdf_store import list_pdfs
+from publications_crawler import crawl, pdf_links
 
 DOWNLOAD_FOLDER = "MNFSR_PDFs"
+PAGES_FOLDER = "MNFSR_PDF_Pages"
 TABLE_FOLDER = "MNFSR_Extracted_Tables"
 MASTER_CSV = "MNFSR_MASTER_DATASET.csv"
 
+MAX_PAGES = 15       # Pages fetched per PDF when RANGE_FETCH is on (FAST)
+RANGE_FETCH = True   # Fetch just those pages with HTTP Range requests
+
 os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)
 os.makedirs(TABLE_FOLDER, exist_ok=True)
 
@@ -22,41 +29,13 @@ os.makedirs(TABLE_FOLDER, exist_ok=True)
 def get_all_pdf_links():
     print("🔍 Scraping MNFSR Publications Page...")
 
-    response = requests.get(BASE_URL)
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    pdf_links = []
-
-    for link in soup.find_all("a"):
-        href = link.get("href")
-        if href and ".pdf" in href.lower():
-            if href.startswith("/"):
-                href = "https://mnfsr.gov.pk" + href
-            pdf_links.append(href)
-
-    print(f"✅ Total PDFs Found: {len(pdf_links)}")
-    return list(set(pdf_links))
-
-
-# ==========================================
-# DOWNLOAD PDFs
-# ==========================================
-
-def download_pdf(url):
-    filename = url.split("/")[-1]
-    filepath = os.path.join(DOWNLOAD_FOLDER, filename)
-
-    if os.path.exists(filepath):
-        print("⚠ Already Downloaded:", filename)
-        return filepath
-
-    print("⬇ Downloading:", filename)
-
-    r = requests.get(url)
-    with open(filepath, "wb") as f:
-        f.write(r.content)
+    # Every listing page and table, fetched only when it has changed;
+    # the crawler also writes MNFSR_Publications_List.csv
+    crawl(["mnfsr_publications"])
+    links = pdf_links("mnfsr_publications")
 
-    return filepath
+    print(f"✅ Total PDFs Found: {len(links)}")
+    return links
 
 
 # ==========================================
@@ -70,72 +49,100 @@ def clean_table(df):
 
 
 # ==========================================
-# FAST TABLE EXTRACTION
+# RANGE-FETCH FIRST PAGES
 # ==========================================
 
-def extract_tables(pdf_file):
-    pdf_name = os.path.basename(pdf_file)
-    print(f"\n📌 Extracting Tables: {pdf_name}")
+def download_first_pages(pdf_links):
+    os.makedirs(PAGES_FOLDER, exist_ok=True)
+
+    session = requests.Session()
+
+    def fetch(job):
+        url, filename = job
+        filepath = os.path.join(PAGES_FOLDER, filename)
 
-    try:
-        # 🚀 Only scan first 15 pages (FAST)
-        tables = camelot.read_pdf(pdf_file, pages="1-15")
+        try:
+            pages, fetched = fetch_pages(url, filepath, last_page=MAX_PAGES, session=session)
+            print(f"⬇ {filename}: {pages} pages, {fetched:,} bytes fetched")
+            return filepath
 
-        if tables.n == 0:
-            print("⚠ No tables found (first 15 pages). Skipping...")
-            return []
+        except Exception as e:
+            print("❌ Failed:", url, e)
+            return None
 
-        extracted = []
+    jobs = list(zip(pdf_links, unique_filenames(pdf_links)))
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        return [p for p in executor.map(fetch, jobs) if p]
 
-        for i, table in enumerate(tables):
-            df = clean_table(table.df)
 
-            if len(df) < 2:
-                continue
+# ==========================================
+# FAST TABLE EXTRACTION
+# ==========================================
 
-            df["Source_PDF"] = pdf_name
+def save_table(df, pdf_file, number):
+    df = clean_table(df)
 
-            out_file = os.path.join(
-                TABLE_FOLDER,
-                f"{pdf_name}_table_{i+1}.csv"
-            )
-            df.to_csv(out_file, index=False)
+    if len(df) < 2:
+        return None
 
-            extracted.append(df)
+    pdf_name = os.path.basename(pdf_file)
+    df["Source_PDF"] = pdf_name
 
-        print(f"✅ Extracted {len(extracted)} tables from {pdf_name}")
-        return extracted
+    out_file = os.path.join(
+        TABLE_FOLDER,
+        f"{pdf_name}_table_{number}.csv"
+    )
+    df.to_csv(out_file, index=False)
 
-    except Exception as e:
-        print("❌ Error:", e)
-        return []
+    return df
 
 
 # ==========================================
-# FULL PIPELINE (MULTI THREAD)
+# FULL PIPELINE (MULTI PROCESS)
 # ==========================================
 
 def run_pipeline():
     pdf_links = get_all_pdf_links()
 
-    # Download PDFs fast
-    print("\n⬇ Downloading PDFs...")
-    with ThreadPoolExecutor(max_workers=6) as executor:
-        pdf_files = list(executor.map(download_pdf, pdf_links))
+    if RANGE_FETCH:
+        # Only the first MAX_PAGES pages ever cross the network
+        print(f"\n⬇ Fetching first {MAX_PAGES} pages of each PDF...")
+        download_first_pages(pdf_links)
+        pdf_folder = PAGES_FOLDER
+
+    else:
+        print("\n⬇ Downloading PDFs...")
+        revisions = []
+        download_pdfs(pdf_links, DOWNLOAD_FOLDER, revisions=revisions)
+        report_revisions(revisions)
+        pdf_folder = DOWNLOAD_FOLDER
+
+    # A publication linked twice is extracted once
+    pdf_files = list_pdfs(pdf_folder)
 
     print("\n🚀 Extracting tables (FAST MODE)...")
 
-    all_tables = []
+    # Each PDF's tables go to disk as soon as they are extracted
+    master = MasterWriter(MASTER_CSV, "mnfsr_fast_extractor")
+    extracted = 0
 
-    for pdf in pdf_files:
-        tables = extract_tables(pdf)
-        all_tables.extend(tables)
+    # 🚀 Only the pages that look like they hold a table, one per core (FAST)
+    plans = plan_pdfs([pdf for pdf in pdf_files if not master.has(pdf)])
 
-    # Combine Master CSV
-    if all_tables:
-        master_df = pd.concat(all_tables, ignore_index=True)
-        master_df.to_csv(MASTER_CSV, index=False)
+    # Tables arrive grouped by PDF, in plan order
+    for (pdf, _, _), tables in extract_tables_by_pdf(plans):
 
+        frames = [save_table(df, pdf, number) for _, number, df in tables]
+        extracted += sum(df is not None for df in frames)
+
+        # PDFs without tables are recorded too, so a resume skips them
+        master.write(pdf, frames)
+
+    print(f"✅ Extracted {extracted} tables")
+
+    # Combine Master CSV
+    if master.commit():
         print("\n🎉 MASTER DATASET CREATED!")
         print("✅ Saved:", MASTER_CSV)
 
@@ -1,27 +1,24 @@
 import os
 import re
-import requests
 import pandas as pd
-from bs4 import BeautifulSoup
 
-import camelot
-from pdf2image import convert_from_path
-import pytesseract
-
-from concurrent.futures import ThreadPoolExecutor
+from extraction_cache import report_revisions
+from extraction_engine import extract_tables_by_pdf, plan_pdfs
+from master_writer import MasterWriter
+from ocr_engine import ocr_pages
+from page_classifier import page_ranges
+from pdf_downloader import download_pdfs as fetch_pdfs
+from pdf_store import list_pdfs
+from publications_crawler import crawl, pdf_links
 
 # ==============================
 # SETTINGS
 # ==============================
 
-URL = "https://mnfsr.gov.pk/Publications"
-
 PDF_FOLDER = "MNFSR_PDFs"
 TABLE_FOLDER = "MNFSR_Tables"
 MASTER_FILE = "MNFSR_MASTER_TABLEAU.csv"
 
-MAX_PAGES_OCR = 5   # OCR only first 5 pages for speed
-THREADS = 4         # Multi-thread processing
 
 # ==============================
 # STEP 1: Download PDFs
@@ -33,159 +30,113 @@ def download_pdfs():
 
     os.makedirs(PDF_FOLDER, exist_ok=True)
 
-    html = requests.get(URL).text
-    soup = BeautifulSoup(html, "html.parser")
-
-    pdf_links = []
-
-    for link in soup.find_all("a"):
-        href = link.get("href")
-
-        if href and ".pdf" in href.lower():
-            if not href.startswith("http"):
-                href = "https://mnfsr.gov.pk" + href
-
-            pdf_links.append(href)
-
-    print("✅ Total PDFs Found:", len(pdf_links))
+    # Every listing page and table, fetched only when it has changed;
+    # the crawler also writes MNFSR_Publications_List.csv
+    crawl(["mnfsr_publications"])
+    links = pdf_links("mnfsr_publications")
 
-    for pdf_url in pdf_links:
-        name = pdf_url.split("/")[-1]
-        path = os.path.join(PDF_FOLDER, name)
+    print("✅ Total PDFs Found:", len(links))
 
-        if os.path.exists(path):
-            continue
-
-        print("⬇ Downloading:", name)
-        data = requests.get(pdf_url).content
-
-        with open(path, "wb") as f:
-            f.write(data)
+    revisions = []
+    fetch_pdfs(links, PDF_FOLDER, revisions=revisions)
+    report_revisions(revisions)
 
     print("✅ All PDFs Ready!\n")
 
 
 # ==============================
-# STEP 2: Detect Scanned PDF
+# STEP 2: Detect Scanned Pages
 # ==============================
 
-def is_scanned(pdf_path):
-
-    try:
-        tables = camelot.read_pdf(pdf_path, pages="1")
-        return len(tables) == 0
-    except:
-        return True
+# Decided per page by table_prefilter.table_pages(): only pages that
+# look like they hold a table, across the whole document
 
 
 # ==============================
 # STEP 3: OCR Extract (FAST MODE)
 # ==============================
 
-def ocr_extract(pdf_path):
+def ocr_extract(pdf_path, pages):
 
     print("🖼 OCR Running (Fast Mode)...")
 
-    images = convert_from_path(pdf_path, first_page=1, last_page=MAX_PAGES_OCR)
-
-    text = ""
-
-    for img in images:
-        text += pytesseract.image_to_string(img)
-
-    return text
+    # Pages are rendered and OCR'd by the worker that picks them up
+    return "".join(text for _, text in ocr_pages(pdf_path, pages))
 
 
 # ==============================
 # STEP 4: Extract Tables
 # ==============================
 
-def extract_tables(pdf_path):
+def ocr_scanned_pages(pdf_path, scanned_pages):
 
     filename = os.path.basename(pdf_path)
 
-    print(f"\n📌 Processing: {filename}")
+    print(f"\n📌 {filename}: scanned pages {page_ranges(scanned_pages)} → OCR Extracting...")
 
-    all_rows = []
-
-    # --- SCANNED PDF → OCR ---
-    if is_scanned(pdf_path):
-
-        print("🖼 Scanned PDF Detected → OCR Extracting...")
-
-        try:
-            text = ocr_extract(pdf_path)
-
-            all_rows.append({
-                "Source_File": filename,
-                "Page": "OCR",
-                "Table_Data": text[:2000]
-            })
-
-        except Exception as e:
-            print("❌ OCR Failed:", e)
-
-        return all_rows
-
-    # --- TEXT PDF → Camelot ---
     try:
-        tables = camelot.read_pdf(pdf_path, pages="1-end")
+        text = ocr_extract(pdf_path, scanned_pages)
 
-        print("✅ Tables Found:", len(tables))
+        return {
+            "Source_File": filename,
+            "Page": "OCR",
+            "Table_Data": text[:2000]
+        }
 
-        for i, table in enumerate(tables):
-            df = table.df
-            df.columns = df.iloc[0]
-            df = df[1:]
+    except Exception as e:
+        print("❌ OCR Failed:", e)
+        return None
 
-            df["Source_File"] = filename
-            df["Table_Number"] = i + 1
 
-            all_rows.append(df)
+def table_frame(df, pdf_path, number):
 
-    except Exception as e:
-        print("❌ Camelot Error:", e)
+    df.columns = df.iloc[0]
+    df = df[1:]
+
+    df["Source_File"] = os.path.basename(pdf_path)
+    df["Table_Number"] = number
 
-    return all_rows
+    return df
 
 
 # ==============================
-# STEP 5: Multi-thread Processing
+# STEP 5: Multi-process Processing
 # ==============================
 
 def process_all_pdfs():
 
     os.makedirs(TABLE_FOLDER, exist_ok=True)
 
-    pdf_files = [
-        os.path.join(PDF_FOLDER, f)
-        for f in os.listdir(PDF_FOLDER)
-        if f.endswith(".pdf")
-    ]
+    # Each PDF's rows go to disk as soon as they are extracted
+    master = MasterWriter(MASTER_FILE, "mnfsr_final_extractor")
+
+    pdf_files = [p for p in list_pdfs(PDF_FOLDER) if not master.has(p)]
 
     print("📂 Total PDFs:", len(pdf_files))
 
-    master_data = []
+    # Page selection, then every candidate page of every PDF across all cores
+    plans = plan_pdfs(pdf_files)
+
+    # Camelot results arrive grouped by PDF, in plan order
+    for (pdf_path, _, scanned_pages), tables in extract_tables_by_pdf(plans):
 
-    with ThreadPoolExecutor(max_workers=THREADS) as executor:
-        results = executor.map(extract_tables, pdf_files)
+        frames = []
 
-        for result in results:
-            for item in result:
+        # --- SCANNED PAGES → OCR ---
+        if scanned_pages:
+            row = ocr_scanned_pages(pdf_path, scanned_pages)
+            if row:
+                frames.append(pd.DataFrame([row]))
 
-                if isinstance(item, pd.DataFrame):
-                    master_data.append(item)
+        # --- TEXT PAGES → Camelot ---
+        frames += [table_frame(df, pdf_path, number) for _, number, df in tables]
 
-                elif isinstance(item, dict):
-                    master_data.append(pd.DataFrame([item]))
+        master.write(pdf_path, frames)
 
     # Combine all
     print("\n📌 Combining into Master Dataset...")
 
-    if master_data:
-        final_df = pd.concat(master_data, ignore_index=True)
-        final_df.to_csv(MASTER_FILE, index=False)
-
+    if master.commit():
         print("🎉 DONE!")
         print("✅ Tableau Master CSV Saved:", MASTER_FILE)
 
@@ -1,15 +1,16 @@
 import os
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import camelot
+
+from extraction_cache import report_revisions
+from extraction_engine import extract_tables_by_pdf, plan_pdfs
+from master_writer import MasterWriter
+from pdf_downloader import download_pdfs as fetch_pdfs
+from pdf_store import list_pdfs
+from publications_crawler import crawl, pdf_links
 
 # ==========================================
 # CONFIG
 # ==========================================
 
-BASE_URL = "https://mnfsr.gov.pk/Publications"
-
 DOWNLOAD_FOLDER = "MNFSR_PDFs"
 TABLE_FOLDER = "MNFSR_Extracted_Tables"
 
@@ -25,22 +26,13 @@ os.makedirs(TABLE_FOLDER, exist_ok=True)
 def get_all_pdf_links():
     print("🔍 Scraping MNFSR Publications Page...")
 
-    response = requests.get(BASE_URL)
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    pdf_links = []
-
-    for link in soup.find_all("a"):
-        href = link.get("href")
-
-        if href and ".pdf" in href.lower():
-            if href.startswith("/"):
-                href = "https://mnfsr.gov.pk" + href
-
-            pdf_links.append(href)
+    # Every listing page and table, fetched only when it has changed;
+    # the crawler also writes MNFSR_Publications_List.csv
+    crawl(["mnfsr_publications"])
+    links = pdf_links("mnfsr_publications")
 
-    print(f"✅ Total PDFs Found: {len(pdf_links)}")
-    return list(set(pdf_links))
+    print(f"✅ Total PDFs Found: {len(links)}")
+    return links
 
 
 # ==========================================
@@ -48,27 +40,12 @@ def get_all_pdf_links():
 # ==========================================
 
 def download_pdfs(pdf_links):
-    downloaded_files = []
-
-    for url in pdf_links:
-        filename = url.split("/")[-1]
-        filepath = os.path.join(DOWNLOAD_FOLDER, filename)
-
-        if os.path.exists(filepath):
-            print("⚠ Already Downloaded:", filename)
-            downloaded_files.append(filepath)
-            continue
-
-        print("⬇ Downloading:", filename)
-
-        r = requests.get(url)
-
-        with open(filepath, "wb") as f:
-            f.write(r.content)
+    revisions = []
+    fetch_pdfs(pdf_links, DOWNLOAD_FOLDER, revisions=revisions)
+    report_revisions(revisions)
 
-        downloaded_files.append(filepath)
-
-    return downloaded_files
+    # A publication linked twice is extracted once
+    return list_pdfs(DOWNLOAD_FOLDER)
 
 
 # ==========================================
@@ -89,35 +66,28 @@ def clean_table(df):
 
 
 # ==========================================
-# 4. EXTRACT TABLES FROM PDF
+# 4. SAVE ONE TABLE
 # ==========================================
 
-def extract_tables_from_pdf(pdf_file):
-    print("\n📌 Extracting Tables From:", pdf_file)
-
-    try:
-        tables = camelot.read_pdf(pdf_file, pages="all")
-
-        if tables.n == 0:
-            print("⚠ No tables found.")
-            return []
+def save_table(df, pdf, idx):
+    df = clean_table(df)
 
-        extracted = []
+    if len(df) < 2:
+        return None
 
-        for i, table in enumerate(tables):
-            df = table.df
-            df = clean_table(df)
+    pdf_name = os.path.basename(pdf)
 
-            if len(df) < 2:
-                continue
+    # Add source column
+    df["Source_PDF"] = pdf_name
 
-            extracted.append(df)
+    # Save individual table CSV
+    table_file = os.path.join(
+        TABLE_FOLDER,
+        f"{pdf_name}_table_{idx}.csv"
+    )
+    df.to_csv(table_file, index=False)
 
-        return extracted
-
-    except Exception as e:
-        print("❌ Error Extracting:", e)
-        return []
+    return df
 
 
 # ==========================================
@@ -125,7 +95,8 @@ def extract_tables_from_pdf(pdf_file):
 # ==========================================
 
 def run_full_pipeline():
-    all_rows = []
+    # Each PDF's tables go to disk as soon as they are extracted
+    master = MasterWriter(MASTER_CSV, "mnfsr_full_dataset_extractor")
 
     # Step 1: Get all PDFs
     pdf_links = get_all_pdf_links()
@@ -134,34 +105,19 @@ def run_full_pipeline():
     pdf_files = download_pdfs(pdf_links)
 
     # Step 3: Extract tables + build master dataset
-    for pdf in pdf_files:
+    # Camelot only sees the pages that look like they hold a table,
+    # one page per task across every core
+    plans = plan_pdfs([pdf for pdf in pdf_files if not master.has(pdf)])
 
-        tables = extract_tables_from_pdf(pdf)
+    for (pdf, _, _), tables in extract_tables_by_pdf(plans):
 
-        if not tables:
-            continue
+        frames = [save_table(df, pdf, idx) for _, idx, df in tables]
 
-        pdf_name = os.path.basename(pdf)
-
-        for idx, df in enumerate(tables):
-
-            # Add source column
-            df["Source_PDF"] = pdf_name
-
-            # Save individual table CSV
-            table_file = os.path.join(
-                TABLE_FOLDER,
-                f"{pdf_name}_table_{idx+1}.csv"
-            )
-            df.to_csv(table_file, index=False)
-
-            all_rows.append(df)
+        # PDFs without tables are recorded too, so a resume skips them
+        master.write(pdf, frames)
 
     # Step 4: Combine into Master CSV
-    if all_rows:
-        master_df = pd.concat(all_rows, ignore_index=True)
-        master_df.to_csv(MASTER_CSV, index=False)
-
+    if master.commit():
         print("\n🎉 MASTER DATASET READY!")
         print("✅ Saved:", MASTER_CSV)
 
@@ -1,18 +1,18 @@
 import os
-import requests
 import pandas as pd
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
 
-import pdfplumber
+from extraction_cache import cached, report_revisions
+from master_writer import MasterWriter
+from pdf_downloader import download_pdfs as fetch_pdfs
+from pdf_session import PDFSession
+from pdf_store import list_pdfs
+from publications_crawler import catalog_publications, crawl, load_state
+from table_prefilter import table_pages
 
 # ===============================
 # SETTINGS
 # ===============================
 
-BASE_URL = "https://mnfsr.gov.pk"
-PUBLICATIONS_URL = BASE_URL + "/Publications"
-
 PDF_FOLDER = "MNFSR_PDFs"
 CSV_FOLDER = "MNFSR_CSVs"
 
@@ -29,39 +29,14 @@ os.makedirs(CSV_FOLDER, exist_ok=True)
 def scrape_publications():
     print("🔍 Scraping MNFSR Publications Page...")
 
-    response = requests.get(PUBLICATIONS_URL)
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    table = soup.find("table")
-
-    if not table:
-        print("❌ No table found!")
-        return []
-
-    rows = table.find_all("tr")[1:]
-
-    data = []
-
-    for row in rows:
-        cols = row.find_all("td")
+    # Every listing page and table, fetched only when it has changed;
+    # the crawler also writes MNFSR_Publications_List.csv
+    crawl(["mnfsr_publications"])
 
-        if len(cols) < 4:
-            continue
-
-        title = cols[1].get_text(strip=True)
-        date = cols[2].get_text(strip=True)
-
-        link_tag = cols[3].find("a")
-        pdf_link = None
-
-        if link_tag and link_tag.get("href"):
-            pdf_link = urljoin(BASE_URL, link_tag["href"])
-
-        data.append({
-            "Title": title,
-            "Date": date,
-            "PDF_Link": pdf_link
-        })
+    data = [
+        {"Title": title, "Date": date, "PDF_Link": pdf_link}
+        for title, date, pdf_link in catalog_publications(load_state(), "mnfsr_publications")
+    ]
 
     print(f"✅ Found {len(data)} Publications")
     return data
@@ -74,28 +49,11 @@ def scrape_publications():
 def download_pdfs(publications):
     print("\n📥 Downloading PDFs...")
 
-    for pub in publications:
-        link = pub["PDF_Link"]
+    links = [pub["PDF_Link"] for pub in publications if pub["PDF_Link"]]
 
-        if not link:
-            continue
-
-        filename = link.split("/")[-1]
-        filepath = os.path.join(PDF_FOLDER, filename)
-
-        if os.path.exists(filepath):
-            print("✔ Already downloaded:", filename)
-            continue
-
-        try:
-            r = requests.get(link)
-            with open(filepath, "wb") as f:
-                f.write(r.content)
-
-            print("✅ Downloaded:", filename)
-
-        except Exception as e:
-            print("❌ Failed:", link, e)
+    revisions = []
+    fetch_pdfs(links, PDF_FOLDER, revisions=revisions)
+    report_revisions(revisions)
 
 
 # ===============================
@@ -106,10 +64,15 @@ def extract_tables_from_pdf(pdf_path):
     extracted_tables = []
 
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages):
+        with PDFSession(pdf_path) as doc:
+            text_pages, _ = table_pages(doc)
 
-                table = page.extract_table()
+            for page_num in text_pages:
+
+                table = cached(
+                    pdf_path, page_num, "pdfplumber", {"method": "extract_table"},
+                    lambda: doc.plumber.pages[page_num - 1].extract_table()
+                )
 
                 if table:
                     df = pd.DataFrame(table[1:], columns=table[0])
@@ -128,19 +91,24 @@ def extract_tables_from_pdf(pdf_path):
 def convert_all_pdfs_to_csv():
     print("\n📊 Extracting Tables from PDFs...")
 
-    master_rows = []
+    # Each PDF's tables go to disk as soon as they are extracted
+    master = MasterWriter(MASTER_CSV, "mnfsr_full_extractor")
 
-    pdf_files = os.listdir(PDF_FOLDER)
+    pdf_files = [os.path.basename(p) for p in list_pdfs(PDF_FOLDER)]
 
     for pdf_file in pdf_files:
         pdf_path = os.path.join(PDF_FOLDER, pdf_file)
 
+        if master.has(pdf_path):
+            continue
+
         print("\n📌 Processing:", pdf_file)
 
         tables = extract_tables_from_pdf(pdf_path)
 
         if not tables:
             print("⚠ No tables found inside:", pdf_file)
+            master.write(pdf_path, [])
             continue
 
         for i, df in enumerate(tables):
@@ -158,13 +126,10 @@ def convert_all_pdfs_to_csv():
             df["Source_PDF"] = pdf_file
             df["Table_Number"] = i + 1
 
-            master_rows.append(df)
+        master.write(pdf_path, tables)
 
     # Combine Master CSV
-    if master_rows:
-        master_df = pd.concat(master_rows, ignore_index=True)
-        master_df.to_csv(MASTER_CSV, index=False)
-
+    if master.commit():
         print("\n🎉 MASTER DATASET READY:", MASTER_CSV)
 
     else:
@@ -178,9 +143,6 @@ def convert_all_pdfs_to_csv():
 def run_full_extractor():
     publications = scrape_publications()
 
-    # Save publication metadata
-    pd.DataFrame(publications).to_csv("MNFSR_Publications_List.csv", index=False)
-
     download_pdfs(publications)
 
     convert_all_pdfs_to_csv()
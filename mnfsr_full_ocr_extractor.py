@@ -1,32 +1,30 @@
 import os
-
-POPPLER_PATH = r"C:\poppler\Library\bin"
-
-import os
-import requests
 import pandas as pd
 import warnings
 
-from bs4 import BeautifulSoup
-
-import camelot
-from pdfminer.high_level import extract_text
-
-from pdf2image import convert_from_path
 import pytesseract
 
+from extraction_cache import report_revisions
+from extraction_engine import extract_tables
+from master_writer import MasterWriter
+from ocr_engine import ocr_pages
+from page_classifier import page_ranges
+from pdf_downloader import download_pdfs
+from pdf_session import PDFSession
+from pdf_store import document_sha256, list_pdfs
+from pipeline_runner import Pipeline
+from publications_crawler import crawl, pdf_links
+from table_prefilter import table_pages
+
 warnings.filterwarnings("ignore")
 
 # ===============================
 # SETTINGS
 # ===============================
 
-MNFSR_URL = "https://mnfsr.gov.pk/Publications"
-
 PDF_FOLDER = "MNFSR_PDFs"
 MASTER_FILE = "MNFSR_MASTER_DATASET.csv"
 
-MAX_PAGES = 5   # OCR is slow, keep small first
 
 # ✅ Set your Tesseract path (Windows)
 pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
@@ -36,39 +34,22 @@ pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tessera
 # STEP 1: DOWNLOAD PDFs
 # ===============================
 
-def download_all_pdfs():
+def download_all_pdfs(on_complete=None):
 
     print("\n🔍 Scraping MNFSR Publications Page...")
 
     os.makedirs(PDF_FOLDER, exist_ok=True)
 
-    response = requests.get(MNFSR_URL)
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    pdf_links = []
-
-    for link in soup.find_all("a", href=True):
-        href = link["href"]
+    # Every listing page and table, fetched only when it has changed;
+    # the crawler also writes MNFSR_Publications_List.csv
+    crawl(["mnfsr_publications"])
+    links = pdf_links("mnfsr_publications")
 
-        if ".pdf" in href.lower():
-            full_url = href if href.startswith("http") else "https://mnfsr.gov.pk" + href
-            pdf_links.append(full_url)
+    print(f"✅ Total PDFs Found: {len(links)}")
 
-    print(f"✅ Total PDFs Found: {len(pdf_links)}")
-
-    for url in pdf_links:
-
-        filename = url.split("/")[-1].replace("%20", "_")
-        filepath = os.path.join(PDF_FOLDER, filename)
-
-        if os.path.exists(filepath):
-            continue
-
-        print(f"⬇ Downloading: {filename}")
-        pdf_data = requests.get(url).content
-
-        with open(filepath, "wb") as f:
-            f.write(pdf_data)
+    revisions = []
+    download_pdfs(links, PDF_FOLDER, on_complete=on_complete, revisions=revisions)
+    report_revisions(revisions)
 
     print("✅ All PDFs Downloaded!")
 
@@ -77,12 +58,8 @@ def download_all_pdfs():
 # STEP 2: CHECK TEXT OR SCANNED
 # ===============================
 
-def is_text_pdf(pdf_path):
-    try:
-        text = extract_text(pdf_path, maxpages=1)
-        return bool(text.strip())
-    except:
-        return False
+# Decided per page by table_prefilter.table_pages(): only pages that
+# look like they hold a table, across the whole document
 
 
 # ===============================
@@ -103,58 +80,46 @@ def clean_dataframe(df):
 # STEP 4A: EXTRACT NORMAL TABLES
 # ===============================
 
-def extract_camelot_tables(pdf_path):
+def extract_camelot_tables(pdf_path, pages):
 
     tables_list = []
 
-    try:
-        tables = camelot.read_pdf(
-            pdf_path,
-            pages=f"1-{MAX_PAGES}",
-            flavor="stream"
-        )
+    for _, _, _, df in extract_tables([(pdf_path, pages, [])], flavor="stream"):
+        df = clean_dataframe(df)
 
-        for i, table in enumerate(tables):
-            df = clean_dataframe(table.df)
+        if df.empty:
+            continue
 
-            if df.empty:
-                continue
+        df["Source_PDF"] = os.path.basename(pdf_path)
+        df["Method"] = "Camelot"
 
-            df["Source_PDF"] = os.path.basename(pdf_path)
-            df["Method"] = "Camelot"
+        tables_list.append(df)
 
-            tables_list.append(df)
+    return tables_list
 
-    except:
-        pass
 
-    return tables_list
+# ===============================
+# STEP 4B: OCR TABLE EXTRACTION
+# ===============================
 
-def extract_ocr_tables(pdf_path):
+def extract_ocr_tables(pdf_path, pages):
 
     print("🖼 Scanned PDF → OCR Running...")
 
     tables_list = []
 
     try:
-        images = convert_from_path(
-            pdf_path,
-            poppler_path=POPPLER_PATH,   # ✅ VERY IMPORTANT
-            first_page=1,
-            last_page=MAX_PAGES
-        )
-
-        for page_num, img in enumerate(images):
+        # Only the pages that are really scans, OCR'd across all cores
+        for page_num, text in ocr_pages(pdf_path, pages):
 
-            print(f"   🔍 OCR Page {page_num+1}")
-
-            text = pytesseract.image_to_string(img)
+            print(f"   🔍 OCR Page {page_num}")
 
             lines = [line.strip() for line in text.split("\n") if line.strip()]
 
             if len(lines) < 5:
                 continue
 
+            # Convert OCR lines into row format
             rows = []
             for line in lines:
                 parts = line.split()
@@ -179,89 +144,80 @@ def extract_ocr_tables(pdf_path):
 
 
 # ===============================
-# STEP 4B: OCR TABLE EXTRACTION
+# STEP 5: MASTER PIPELINE
 # ===============================
 
-def extract_ocr_tables(pdf_path):
+def stream_pdfs(emit):
+    """Each PDF as soon as it lands, then any left from earlier runs."""
 
-    print("🖼 Scanned PDF → OCR Running...")
+    seen = set()
 
-    tables_list = []
+    def landed(pdf_path):
+        sha256 = document_sha256(pdf_path)
 
-    try:
-        images = convert_from_path(pdf_path, first_page=1, last_page=MAX_PAGES)
-
-        for page_num, img in enumerate(images):
-
-            print(f"   🔍 OCR Page {page_num+1}")
-
-            text = pytesseract.image_to_string(img)
+        # Every copy of the same document is processed once
+        if sha256 not in seen:
+            seen.add(sha256)
+            emit(pdf_path)
 
-            lines = [line.strip() for line in text.split("\n") if line.strip()]
+    download_all_pdfs(on_complete=landed)
 
-            if len(lines) < 5:
-                continue
+    for pdf_path in list_pdfs(PDF_FOLDER):
+        landed(pdf_path)
 
-            # Convert OCR lines into row format
-            rows = []
-            for line in lines:
-                parts = line.split()
-                if len(parts) >= 2:
-                    rows.append(parts)
 
-            if not rows:
-                continue
+def plan_pdf(pdf_path, master):
 
-            df = pd.DataFrame(rows)
-            df = clean_dataframe(df)
+    if master.has(pdf_path):
+        return None
 
-            df["Source_PDF"] = os.path.basename(pdf_path)
-            df["Method"] = "OCR"
+    with PDFSession(pdf_path) as doc:
+        text_pages, scanned_pages = table_pages(doc)
 
-            tables_list.append(df)
+    return pdf_path, text_pages, scanned_pages
 
-    except Exception as e:
-        print("❌ OCR Failed:", e)
 
-    return tables_list
+def extract_pdf(plan):
 
+    pdf_path, text_pages, scanned_pages = plan
 
-# ===============================
-# STEP 5: MASTER PIPELINE
-# ===============================
+    print(f"\n📌 Processing: {os.path.basename(pdf_path)}")
 
-def run_full_extraction():
+    tables = []
 
-    all_tables = []
+    if text_pages:
+        print(f"✅ Text pages {page_ranges(text_pages)} → Camelot Extracting...")
+        tables += extract_camelot_tables(pdf_path, text_pages)
 
-    pdf_files = [f for f in os.listdir(PDF_FOLDER) if f.endswith(".pdf")]
+    if scanned_pages:
+        tables += extract_ocr_tables(pdf_path, scanned_pages)
 
-    print(f"\n📂 Total PDFs Found: {len(pdf_files)}")
+    return pdf_path, tables
 
-    for pdf in pdf_files:
 
-        pdf_path = os.path.join(PDF_FOLDER, pdf)
+def run_full_extraction():
 
-        print(f"\n📌 Processing: {pdf}")
+    # Each PDF's tables go to disk as soon as they are extracted
+    master = MasterWriter(MASTER_FILE, "mnfsr_full_ocr_extractor")
 
-        if is_text_pdf(pdf_path):
-            print("✅ Text PDF → Camelot Extracting...")
-            tables = extract_camelot_tables(pdf_path)
+    # Download, page detection and extraction overlap: the first PDF is
+    # extracted while the rest are still downloading, and the bounded
+    # queue keeps at most a few PDFs' tables waiting for the writer.
+    pipeline = (
+        Pipeline(stream_pdfs)
+        .stage("classify", lambda pdf_path: plan_pdf(pdf_path, master), queue_size=0)
+        .stage("extract", extract_pdf)
+    )
 
-        else:
-            tables = extract_ocr_tables(pdf_path)
+    for pdf_path, tables in pipeline.run():
+        master.write(pdf_path, tables)
 
-        all_tables.extend(tables)
+    print("\n📌 Combining All Tables...")
 
-    if not all_tables:
+    if not master.commit():
         print("\n❌ No data extracted.")
         return
 
-    print("\n📌 Combining All Tables...")
-
-    master_df = pd.concat(all_tables, ignore_index=True)
-    master_df.to_csv(MASTER_FILE, index=False)
-
     print("\n🎉 DONE!")
     print(f"✅ Master Dataset Saved: {MASTER_FILE}")
 
@@ -272,5 +228,4 @@ def run_full_extraction():
 
 if __name__ == "__main__":
 
-    download_all_pdfs()
     run_full_extraction()
@@ -1,27 +1,29 @@
 import os
-import requests
-import pandas as pd
 import warnings
 
-from bs4 import BeautifulSoup
-from pdfminer.high_level import extract_text
-import camelot
 import ocrmypdf
 
+import extraction_engine
+from extraction_cache import report_revisions
+from master_writer import MasterWriter
+from page_classifier import page_ranges
+from pdf_downloader import download_pdfs
+from pdf_session import PDFSession
+from pdf_store import list_pdfs
+from publications_crawler import crawl, pdf_links
+from table_prefilter import table_pages
+
 warnings.filterwarnings("ignore")
 
 # ===============================
 # SETTINGS
 # ===============================
 
-MNFSR_URL = "https://mnfsr.gov.pk/Publications"
-
 PDF_FOLDER = "MNFSR_PDFs"
 OCR_FOLDER = "MNFSR_OCR_PDFs"
 
 MASTER_FILE = "MNFSR_MASTER_DATASET.csv"
 
-MAX_PAGES = 5  # Keep small for testing
 
 # ===============================
 # STEP 1: DOWNLOAD PDFs
@@ -33,34 +35,16 @@ def download_all_pdfs():
 
     os.makedirs(PDF_FOLDER, exist_ok=True)
 
-    response = requests.get(MNFSR_URL)
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    pdf_links = []
-
-    for link in soup.find_all("a", href=True):
-        href = link["href"]
-
-        if ".pdf" in href.lower():
-            full_url = href if href.startswith("http") else "https://mnfsr.gov.pk" + href
-            pdf_links.append(full_url)
-
-    print(f"✅ Total PDFs Found: {len(pdf_links)}")
+    # Every listing page and table, fetched only when it has changed;
+    # the crawler also writes MNFSR_Publications_List.csv
+    crawl(["mnfsr_publications"])
+    links = pdf_links("mnfsr_publications")
 
-    for url in pdf_links:
+    print(f"✅ Total PDFs Found: {len(links)}")
 
-        filename = url.split("/")[-1].replace("%20", "_")
-        filepath = os.path.join(PDF_FOLDER, filename)
-
-        if os.path.exists(filepath):
-            continue
-
-        print(f"⬇ Downloading: {filename}")
-
-        pdf_data = requests.get(url).content
-
-        with open(filepath, "wb") as f:
-            f.write(pdf_data)
+    revisions = []
+    download_pdfs(links, PDF_FOLDER, revisions=revisions)
+    report_revisions(revisions)
 
     print("\n✅ All PDFs Downloaded Successfully!")
 
@@ -69,19 +53,15 @@ def download_all_pdfs():
 # STEP 2: CHECK TEXT PDF
 # ===============================
 
-def is_text_pdf(pdf_path):
-    try:
-        text = extract_text(pdf_path, maxpages=1)
-        return bool(text.strip())
-    except:
-        return False
+# Decided per page by table_prefilter.table_pages(): only pages that
+# look like they hold a table, across the whole document
 
 
 # ===============================
 # STEP 3: OCR SCANNED PDF
 # ===============================
 
-def convert_scanned_to_searchable(pdf_path):
+def convert_scanned_to_searchable(pdf_path, pages):
 
     os.makedirs(OCR_FOLDER, exist_ok=True)
 
@@ -91,12 +71,14 @@ def convert_scanned_to_searchable(pdf_path):
     if os.path.exists(output_pdf):
         return output_pdf
 
-    print("🖼 Scanned PDF → Running OCRmyPDF...")
+    print(f"🖼 Scanned pages {page_ranges(pages)} → Running OCRmyPDF...")
 
     try:
+        # Only the scanned pages are rasterised; text pages pass through
         ocrmypdf.ocr(
             pdf_path,
             output_pdf,
+            pages=page_ranges(pages),
             deskew=True,
             force_ocr=True
         )
@@ -127,22 +109,21 @@ def clean_dataframe(df):
 # STEP 5: EXTRACT TABLES USING CAMELOT
 # ===============================
 
-def extract_tables(pdf_path):
+def extract_tables(pdf_path, pages):
 
     tables_list = []
 
     try:
-        tables = camelot.read_pdf(
-            pdf_path,
-            pages=f"1-{MAX_PAGES}",
-            flavor="stream"
-        )
+        tables = [
+            df for _, _, _, df in
+            extraction_engine.extract_tables([(pdf_path, pages, [])], flavor="stream")
+        ]
 
-        print(f"📌 Tables Found: {tables.n}")
+        print(f"📌 Tables Found: {len(tables)}")
 
-        for table in tables:
+        for df in tables:
 
-            df = clean_dataframe(table.df)
+            df = clean_dataframe(df)
 
             if df.empty:
                 continue
@@ -164,9 +145,10 @@ def extract_tables(pdf_path):
 
 def run_full_extraction():
 
-    all_tables = []
+    # Each PDF's tables go to disk as soon as they are extracted
+    master = MasterWriter(MASTER_FILE, "mnfsr_full_ocrmypdf_extractor")
 
-    pdf_files = [f for f in os.listdir(PDF_FOLDER) if f.endswith(".pdf")]
+    pdf_files = [os.path.basename(p) for p in list_pdfs(PDF_FOLDER)]
 
     print(f"\n📂 Total PDFs Found: {len(pdf_files)}")
 
@@ -174,34 +156,40 @@ def run_full_extraction():
 
         pdf_path = os.path.join(PDF_FOLDER, pdf)
 
+        if master.has(pdf_path):
+            continue
+
         print("\n====================================")
         print(f"📌 Processing: {pdf}")
         print("====================================")
 
-        # Case 1: Text PDF
-        if is_text_pdf(pdf_path):
-            print("✅ Text PDF → Direct Camelot Extraction")
-            tables = extract_tables(pdf_path)
+        with PDFSession(pdf_path) as doc:
+            text_pages, scanned_pages = table_pages(doc)
 
-        # Case 2: Scanned PDF
-        else:
-            searchable_pdf = convert_scanned_to_searchable(pdf_path)
+        source_pdf = pdf_path
+
+        # Scanned pages: OCR just those, then read the searchable copy
+        if scanned_pages:
+            searchable_pdf = convert_scanned_to_searchable(pdf_path, scanned_pages)
 
             if searchable_pdf:
-                tables = extract_tables(searchable_pdf)
-            else:
-                tables = []
+                source_pdf = searchable_pdf
+                text_pages = sorted(text_pages + scanned_pages)
 
-        all_tables.extend(tables)
+        # Text pages: direct Camelot extraction
+        if text_pages:
+            print(f"✅ Text pages {page_ranges(text_pages)} → Camelot Extraction")
+            tables = extract_tables(source_pdf, text_pages)
+        else:
+            tables = []
 
-    if not all_tables:
-        print("\n❌ No tables extracted.")
-        return
+        master.write(pdf_path, tables)
 
     print("\n📌 Combining All Tables into Master Dataset...")
 
-    master_df = pd.concat(all_tables, ignore_index=True)
-    master_df.to_csv(MASTER_FILE, index=False)
+    if not master.commit():
+        print("\n❌ No tables extracted.")
+        return
 
     print("\n🎉 DONE SUCCESSFULLY!")
     print(f"✅ Master Dataset Saved: {MASTER_FILE}")
@@ -1,26 +1,23 @@
 import os
 import re
 import warnings
-import requests
-import pandas as pd
 
-from bs4 import BeautifulSoup
-
-import camelot
-from pdfminer.high_level import extract_text
+from extraction_cache import report_revisions
+from extraction_engine import extract_tables_by_pdf, plan_pdfs
+from master_writer import MasterWriter
+from page_classifier import page_ranges
+from pdf_downloader import download_pdfs
+from pdf_store import list_pdfs
+from publications_crawler import crawl, pdf_links
 
 # ===============================
 # SETTINGS
 # ===============================
 
-MNFSR_URL = "https://mnfsr.gov.pk/Publications"
-
 PDF_FOLDER = "MNFSR_PDFs"
 TABLE_FOLDER = "Extracted_Tables"
 MASTER_FILE = "MNFSR_MASTER_DATASET.csv"
 
-MAX_PAGES = 15   # only first 15 pages for speed
-
 warnings.filterwarnings("ignore")
 
 
@@ -34,37 +31,16 @@ def download_all_pdfs():
 
     os.makedirs(PDF_FOLDER, exist_ok=True)
 
-    response = requests.get(MNFSR_URL)
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    pdf_links = []
-
-    for link in soup.find_all("a", href=True):
-        href = link["href"]
-
-        if ".pdf" in href.lower():
-            full_url = href if href.startswith("http") else "https://mnfsr.gov.pk" + href
-            pdf_links.append(full_url)
-
-    print(f"✅ Total PDFs Found: {len(pdf_links)}")
-
-    for url in pdf_links:
+    # Every listing page and table, fetched only when it has changed;
+    # the crawler also writes MNFSR_Publications_List.csv
+    crawl(["mnfsr_publications"])
+    links = pdf_links("mnfsr_publications")
 
-        filename = url.split("/")[-1]
-        filename = filename.replace("%20", "_")
+    print(f"✅ Total PDFs Found: {len(links)}")
 
-        filepath = os.path.join(PDF_FOLDER, filename)
-
-        if os.path.exists(filepath):
-            print(f"⚠ Already Downloaded: {filename}")
-            continue
-
-        print(f"⬇ Downloading: {filename}")
-
-        pdf_data = requests.get(url).content
-
-        with open(filepath, "wb") as f:
-            f.write(pdf_data)
+    revisions = []
+    download_pdfs(links, PDF_FOLDER, revisions=revisions)
+    report_revisions(revisions)
 
     print("\n✅ All PDFs Downloaded Successfully!")
 
@@ -73,12 +49,8 @@ def download_all_pdfs():
 # STEP 2: CHECK TEXT PDF OR SCANNED
 # ===============================
 
-def is_text_pdf(pdf_path):
-    try:
-        text = extract_text(pdf_path, maxpages=1)
-        return bool(text.strip())
-    except:
-        return False
+# Decided per page by table_prefilter.table_pages(): only pages that
+# look like they hold a table, across the whole document
 
 
 # ===============================
@@ -106,48 +78,17 @@ def clean_dataframe(df):
 # STEP 4: EXTRACT TABLES (FAST)
 # ===============================
 
-def extract_tables_from_pdf(pdf_path):
-
-    filename = os.path.basename(pdf_path)
-
-    print(f"\n📌 Processing: {filename}")
-
-    if not is_text_pdf(pdf_path):
-        print("🖼️ Scanned PDF detected → OCR needed later (skipping)")
-        return []
+def table_frame(df, pdf_path, number):
 
-    try:
-        tables = camelot.read_pdf(
-            pdf_path,
-            pages=f"1-{MAX_PAGES}",
-            flavor="stream"
-        )
+    df = clean_dataframe(df)
 
-        if tables.n == 0:
-            print("⚠ No tables found.")
-            return []
+    if df.empty or len(df) < 2:
+        return None
 
-        extracted = []
+    df["Source_PDF"] = os.path.basename(pdf_path)
+    df["Table_Number"] = number
 
-        for i, table in enumerate(tables):
-
-            df = table.df
-            df = clean_dataframe(df)
-
-            if df.empty or len(df) < 2:
-                continue
-
-            df["Source_PDF"] = filename
-            df["Table_Number"] = i + 1
-
-            extracted.append(df)
-
-        print(f"✅ Tables Extracted: {len(extracted)}")
-        return extracted
-
-    except Exception as e:
-        print("❌ Error:", e)
-        return []
+    return df
 
 
 # ===============================
@@ -158,29 +99,38 @@ def build_master_dataset():
 
     os.makedirs(TABLE_FOLDER, exist_ok=True)
 
-    all_tables = []
+    # Each PDF's tables go to disk as soon as they are extracted
+    master = MasterWriter(MASTER_FILE, "mnfsr_master_extractor")
 
-    pdf_files = [f for f in os.listdir(PDF_FOLDER) if f.endswith(".pdf")]
+    pdf_files = [p for p in list_pdfs(PDF_FOLDER) if not master.has(p)]
 
     print(f"\n📂 Total PDFs to Process: {len(pdf_files)}")
 
-    for pdf in pdf_files:
+    # Page selection per PDF, then Camelot page by page on every core
+    plans = plan_pdfs(pdf_files)
 
-        path = os.path.join(PDF_FOLDER, pdf)
+    for pdf_path, text_pages, scanned_pages in plans:
+        if scanned_pages:
+            print(f"🖼️ {os.path.basename(pdf_path)}: scanned pages {page_ranges(scanned_pages)} → OCR needed later (skipping)")
 
-        tables = extract_tables_from_pdf(path)
+    extracted = 0
 
-        all_tables.extend(tables)
+    # Tables arrive in PDF order: write each PDF as soon as it is complete
+    for (pdf_path, _, _), tables in extract_tables_by_pdf(plans, flavor="stream"):
 
-    if not all_tables:
-        print("\n❌ No tables extracted from any PDF.")
-        return
+        frames = [table_frame(df, pdf_path, number) for _, number, df in tables]
+        extracted += sum(df is not None for df in frames)
 
-    print("\n📌 Combining into MASTER CSV...")
+        # PDFs without tables are recorded too, so a resume skips them
+        master.write(pdf_path, frames)
 
-    master_df = pd.concat(all_tables, ignore_index=True)
+    print(f"✅ Tables Extracted: {extracted}")
 
-    master_df.to_csv(MASTER_FILE, index=False)
+    print("\n📌 Combining into MASTER CSV...")
+
+    if not master.commit():
+        print("\n❌ No tables extracted from any PDF.")
+        return
 
     print("\n🎉 DONE!")
     print(f"✅ Master Tableau Dataset Saved: {MASTER_FILE}")
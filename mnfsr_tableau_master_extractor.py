@@ -1,26 +1,28 @@
 import os
-import requests
 import pandas as pd
 
-from bs4 import BeautifulSoup
-
-import camelot
-import pdfplumber
-
 from paddleocr import PaddleOCR
 
+from extraction_cache import cached, report_revisions
+from extraction_engine import extract_tables
+from master_writer import MasterWriter
+from page_classifier import page_ranges
+from pdf_downloader import download_pdfs
+from pdf_session import PDFSession
+from pdf_store import list_pdfs
+from publications_crawler import crawl, pdf_links
+from table_prefilter import table_pages
+
 # ===============================
 # SETTINGS
 # ===============================
 
-MNFSR_URL = "https://mnfsr.gov.pk/Publications"
-
 PDF_FOLDER = "MNFSR_PDFs"
 OUTPUT_FOLDER = "MNFSR_Clean_Tables"
 
 MASTER_FILE = "MNFSR_TABLEAU_MASTER.csv"
 
-MAX_PAGES = 3   # Keep small first
+OCR_DPI = 250   # Render resolution for PaddleOCR
 
 os.makedirs(PDF_FOLDER, exist_ok=True)
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
@@ -40,34 +42,16 @@ def download_all_pdfs():
 
     print("\n🔍 Scraping MNFSR Publications Page...")
 
-    response = requests.get(MNFSR_URL)
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    pdf_links = []
-
-    for link in soup.find_all("a", href=True):
-        href = link["href"]
-
-        if ".pdf" in href.lower():
-            full_url = href if href.startswith("http") else "https://mnfsr.gov.pk" + href
-            pdf_links.append(full_url)
-
-    print(f"✅ Total PDFs Found: {len(pdf_links)}")
+    # Every listing page and table, fetched only when it has changed;
+    # the crawler also writes MNFSR_Publications_List.csv
+    crawl(["mnfsr_publications"])
+    links = pdf_links("mnfsr_publications")
 
-    for url in pdf_links:
+    print(f"✅ Total PDFs Found: {len(links)}")
 
-        filename = url.split("/")[-1].replace("%20", "_")
-        filepath = os.path.join(PDF_FOLDER, filename)
-
-        if os.path.exists(filepath):
-            print(f"⚠ Already Downloaded: {filename}")
-            continue
-
-        print(f"⬇ Downloading: {filename}")
-        pdf_data = requests.get(url).content
-
-        with open(filepath, "wb") as f:
-            f.write(pdf_data)
+    revisions = []
+    download_pdfs(links, PDF_FOLDER, revisions=revisions)
+    report_revisions(revisions)
 
     print("✅ PDF Download Complete!")
 
@@ -76,14 +60,8 @@ def download_all_pdfs():
 # STEP 2: TEXT PDF CHECK
 # ===============================
 
-def is_text_pdf(pdf_path):
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            first_page = pdf.pages[0]
-            text = first_page.extract_text()
-            return bool(text)
-    except:
-        return False
+# Decided per page by table_prefilter.table_pages(): only pages that
+# look like they hold a table, across the whole document
 
 
 # ===============================
@@ -104,30 +82,20 @@ def clean_table(df):
 # STEP 4A: CAMELot TABLES
 # ===============================
 
-def extract_camelot(pdf_path):
+def extract_camelot(pdf_path, pages):
 
     extracted = []
 
-    try:
-        tables = camelot.read_pdf(
-            pdf_path,
-            pages=f"1-{MAX_PAGES}",
-            flavor="stream"
-        )
-
-        for t in tables:
-            df = clean_table(t.df)
+    for _, _, _, df in extract_tables([(pdf_path, pages, [])], flavor="stream"):
+        df = clean_table(df)
 
-            if df.empty:
-                continue
-
-            df["Source"] = os.path.basename(pdf_path)
-            df["Method"] = "Camelot"
+        if df.empty:
+            continue
 
-            extracted.append(df)
+        df["Source"] = os.path.basename(pdf_path)
+        df["Method"] = "Camelot"
 
-    except:
-        pass
+        extracted.append(df)
 
     return extracted
 
@@ -136,36 +104,31 @@ def extract_camelot(pdf_path):
 # STEP 4B: OCR TABLE EXTRACTION
 # ===============================
 
-def extract_ocr(pdf_path):
+def extract_ocr(doc, pages):
 
     extracted = []
 
     print("🖼 Scanned PDF → PaddleOCR Running...")
 
-    with pdfplumber.open(pdf_path) as pdf:
+    for page_no in pages:
 
-        for page_no in range(min(MAX_PAGES, len(pdf.pages))):
-
-            page = pdf.pages[page_no]
-            image = page.to_image(resolution=250).original
-
-            result = ocr.ocr(image)
+        lines = cached(
+            doc.path, page_no, "paddleocr", {"dpi": OCR_DPI},
+            lambda: [line[1][0] for line in ocr.ocr(doc.raster(page_no, dpi=OCR_DPI))[0]]
+        )
 
-            rows = []
-            for line in result[0]:
-                text = line[1][0]
-                rows.append([text])
+        rows = [[text] for text in lines]
 
-            if len(rows) < 5:
-                continue
+        if len(rows) < 5:
+            continue
 
-            df = pd.DataFrame(rows)
-            df = clean_table(df)
+        df = pd.DataFrame(rows)
+        df = clean_table(df)
 
-            df["Source"] = os.path.basename(pdf_path)
-            df["Method"] = "OCR"
+        df["Source"] = os.path.basename(doc.path)
+        df["Method"] = "OCR"
 
-            extracted.append(df)
+        extracted.append(df)
 
     return extracted
 
@@ -176,9 +139,10 @@ def extract_ocr(pdf_path):
 
 def run_pipeline():
 
-    all_tables = []
+    # Each PDF's tables go to disk as soon as they are extracted
+    master = MasterWriter(MASTER_FILE, "mnfsr_tableau_master_extractor")
 
-    pdf_files = [f for f in os.listdir(PDF_FOLDER) if f.endswith(".pdf")]
+    pdf_files = [os.path.basename(p) for p in list_pdfs(PDF_FOLDER)]
 
     print(f"\n📂 Processing {len(pdf_files)} PDFs...\n")
 
@@ -186,15 +150,25 @@ def run_pipeline():
 
         pdf_path = os.path.join(PDF_FOLDER, pdf)
 
+        if master.has(pdf_path):
+            continue
+
         print(f"📌 {pdf}")
 
-        if is_text_pdf(pdf_path):
-            print("   ✅ Text PDF → Camelot")
-            tables = extract_camelot(pdf_path)
+        # One parse serves page detection and OCR rendering
+        with PDFSession(pdf_path) as doc:
 
-        else:
-            print("   🖼 Scanned PDF → OCR")
-            tables = extract_ocr(pdf_path)
+            text_pages, scanned_pages = table_pages(doc)
+
+            tables = []
+
+            if text_pages:
+                print(f"   ✅ Text pages {page_ranges(text_pages)} → Camelot")
+                tables += extract_camelot(pdf_path, text_pages)
+
+            if scanned_pages:
+                print(f"   🖼 Scanned pages {page_ranges(scanned_pages)} → OCR")
+                tables += extract_ocr(doc, scanned_pages)
 
         if tables:
             pdf_out = os.path.join(
@@ -207,19 +181,16 @@ def run_pipeline():
 
             print(f"   ✅ Saved: {pdf_out}")
 
-            all_tables.extend(tables)
-
         else:
             print("   ⚠ No tables found")
 
-    if not all_tables:
-        print("\n❌ No data extracted.")
-        return
+        master.write(pdf_path, tables)
 
     print("\n📌 Creating Master Tableau Dataset...")
 
-    master = pd.concat(all_tables, ignore_index=True)
-    master.to_csv(MASTER_FILE, index=False)
+    if not master.commit():
+        print("\n❌ No data extracted.")
+        return
 
     print("\n🎉 DONE!")
     print(f"✅ Tableau Master Dataset Saved: {MASTER_FILE}")
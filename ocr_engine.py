@@ -0,0 +1,185 @@
+import os
+import threading
+from importlib.util import find_spec
+
+import pytesseract
+
+from extraction_cache import ENABLED as CACHE_ENABLED, MISS
+from extraction_cache import cache_key, extraction_cache
+from pdf_session import RASTER_DPI, PDFSession
+from worker_pool import WORKERS, worker_pool
+
+# ===============================
+# SETTINGS
+# ===============================
+
+TESSERACT_LANG = "eng"
+TESSDATA_PATH = os.environ.get("TESSDATA_PREFIX")   # None: tesserocr's built-in path
+
+# With tesserocr installed (pip install tesserocr) Tesseract is loaded
+# once per process and fed raw pixels; otherwise pytesseract writes a
+# temp image and starts tesseract.exe for every page. Imported on first
+# use, so a pool worker loads it after worker_pool has set
+# OMP_THREAD_LIMIT; an in-process run keeps the caller's environment.
+TESSEROCR = find_spec("tesserocr") is not None
+
+
+# ===============================
+# TESSERACT BACKENDS
+# ===============================
+
+_api = None
+_api_lock = threading.Lock()   # One Tesseract instance is not thread-safe
+
+
+def _tesseract_api():
+    """This process's Tesseract, loaded on first use; None to fall back."""
+
+    global _api, TESSEROCR
+
+    if _api is None and TESSEROCR:
+        try:
+            import tesserocr
+
+            kwargs = {"path": TESSDATA_PATH} if TESSDATA_PATH else {}
+            _api = tesserocr.PyTessBaseAPI(lang=TESSERACT_LANG, **kwargs)
+        except Exception as e:
+            print(f"⚠ tesserocr unavailable ({e}), using pytesseract")
+            TESSEROCR = False
+
+    return _api
+
+
+def image_to_string(image, dpi=RASTER_DPI):
+    """OCR one PIL image, in-process when tesserocr is available."""
+
+    with _api_lock:
+        api = _tesseract_api()
+
+        if api is None:
+            return pytesseract.image_to_string(image, lang=TESSERACT_LANG)
+
+        # Raw pixels straight from the render - no temp file, no encoding
+        if image.mode not in ("L", "RGB"):
+            image = image.convert("RGB")
+
+        channels = len(image.getbands())
+        api.SetImageBytes(image.tobytes(), image.width, image.height, channels, image.width * channels)
+        api.SetSourceResolution(dpi)
+
+        return api.GetUTF8Text()
+
+
+# ===============================
+# WORKER TASKS (run in child processes)
+# ===============================
+
+_session = None
+
+
+def _open(pdf_path):
+    """The worker's open document - reused while its pages keep coming."""
+
+    global _session
+
+    if _session is None or _session.path != pdf_path:
+        _close()
+        _session = PDFSession(pdf_path)
+
+    return _session
+
+
+def _close():
+    global _session
+
+    if _session is not None:
+        _session.close()
+        _session = None
+
+
+def _ocr_page(task):
+    """
+    Render one page and OCR it. None on failure, so the error is not
+    cached as an empty page.
+    """
+
+    pdf_path, page, dpi, tesseract_cmd = task
+
+    # A spawned worker has not seen the caller's setting
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+    try:
+        return image_to_string(_open(pdf_path).raster(page, dpi=dpi), dpi)
+    except Exception as e:
+        print(f"❌ OCR Error: {os.path.basename(pdf_path)} page {page}: {e}")
+        return None
+
+
+# ===============================
+# ENGINE
+# ===============================
+
+def ocr_pages(pdf_path, pages, dpi=RASTER_DPI, workers=WORKERS):
+    """
+    Tesseract over `pages` of a PDF, one page per task, spread across
+    `workers` processes.
+
+    Each worker renders its page only when it picks the task up, so
+    peak memory is one raster per worker whatever the document size.
+    Yields (page, text) in page order; pages already in the extraction
+    cache are not rendered at all, and pages that fail are skipped.
+    """
+
+    pages = list(pages)
+
+    if not pages:
+        return
+
+    params = {"dpi": dpi}
+    keys = {}
+    cached = {}
+
+    if CACHE_ENABLED:
+        cache = extraction_cache()
+
+        for page in pages:
+            keys[page] = cache_key(pdf_path, page, "tesseract", params)
+            text = cache.get(keys[page])
+            if text is not MISS:
+                cached[page] = text
+
+    cmd = pytesseract.pytesseract.tesseract_cmd
+    misses = [(pdf_path, page, dpi, cmd) for page in pages if page not in cached]
+
+    print(f"🔍 OCR on {len(misses)} pages ({workers} processes), {len(cached)} from cache...")
+
+    in_process = workers <= 1 or len(misses) <= 1
+
+    if in_process:
+        results = map(_ocr_page, misses)
+    else:
+        # Shared with Camelot, and kept warm: every worker loads
+        # Tesseract once and reuses it across documents
+        results = worker_pool(workers).map(_ocr_page, misses)
+
+    try:
+        for page in pages:
+
+            if page in cached:
+                text = cached[page]
+            else:
+                text = next(results)
+
+                if text is None:
+                    continue
+                if page in keys:
+                    cache.put(keys[page], text)
+
+            yield page, text
+
+    finally:
+        if in_process:
+            _close()
+        else:
+            # Drops the pages not started yet; the pool stays up
+            results.close()
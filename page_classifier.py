@@ -0,0 +1,193 @@
+import re
+
+from pypdf import PdfReader
+from pypdf.errors import PdfReadError
+
+# ===============================
+# SETTINGS
+# ===============================
+
+TEXT = "text"          # Real glyphs on the page -> Camelot
+SCANNED = "scanned"    # Page is essentially a picture -> OCR
+BLANK = "blank"        # Nothing to extract
+
+MIN_TEXT_OPS = 5       # Text-showing operators that make a page "text"
+SCAN_COVERAGE = 0.5    # Share of the page an image must cover to be a scan
+SCAN_PIXELS = 500_000  # Fallback when the image's placement can't be read
+MAX_FORM_DEPTH = 3     # Nested Form XObjects inspected
+
+# ") Tj", "] TJ", "> Tj" ... - a string being shown
+TEXT_SHOW = re.compile(rb"[)\]>]\s*(?:Tj|TJ|'|\")")
+# Literal and hex strings - a page showing only "( )" has nothing to read
+STRING = re.compile(rb"\((?:[^()\\]|\\.)*\)|<[0-9A-Fa-f\s]+>")
+
+_NUM = rb"([-+]?(?:\d+\.?\d*|\.\d+))"
+IMAGE_DRAW = re.compile(
+    rb"\s+".join([_NUM] * 6) + rb"\s+cm\s*/([^\s/\[\]()<>{}%]+)\s+Do"
+)
+
+
+# ===============================
+# PAGE INSPECTION (no layout analysis)
+# ===============================
+
+def _stream_data(obj):
+    try:
+        return obj.get_data()
+    except (PdfReadError, ValueError, NotImplementedError):
+        return b""
+
+
+def _resources(obj):
+    resources = obj.get("/Resources")
+    return resources.get_object() if resources is not None else {}
+
+
+def _collect(data, resources, found, depth=0):
+    """Text operators, fonts and image placements of a stream and its forms."""
+
+    found["text_ops"] += len(TEXT_SHOW.findall(data))
+    found["glyphs"] += sum(len(s[1:-1].strip()) for s in STRING.findall(data))
+
+    fonts = resources.get("/Font")
+    if fonts is not None:
+        found["fonts"] += len(fonts.get_object())
+
+    xobjects = resources.get("/XObject")
+    if xobjects is None:
+        return
+
+    xobjects = xobjects.get_object()
+    placed = {m[6].decode("latin-1"): m[:6] for m in IMAGE_DRAW.findall(data)}
+
+    for name, ref in xobjects.items():
+        xobject = ref.get_object()
+        subtype = xobject.get("/Subtype")
+
+        if subtype == "/Image":
+            matrix = placed.get(name.lstrip("/"))
+            area = None
+            if matrix:
+                a, b, c, d = (float(v) for v in matrix[:4])
+                area = abs(a * d - b * c)
+
+            pixels = int(xobject.get("/Width", 0)) * int(xobject.get("/Height", 0))
+            found["images"].append((area, pixels))
+
+        elif subtype == "/Form" and depth < MAX_FORM_DEPTH:
+            _collect(_stream_data(xobject), _resources(xobject), found, depth + 1)
+
+
+def inspect_page(page):
+    """Counts behind the label: text operators, glyphs, fonts, images, image coverage."""
+
+    found = {"text_ops": 0, "glyphs": 0, "fonts": 0, "images": []}
+
+    contents = page.get_contents()
+    data = contents.get_data() if contents is not None else b""
+
+    _collect(data, _resources(page), found)
+
+    box = page.mediabox
+    page_area = abs(float(box.width) * float(box.height)) or 1.0
+
+    coverage = 0.0
+    for area, pixels in found["images"]:
+        if area is not None:
+            coverage = max(coverage, area / page_area)
+        elif pixels >= SCAN_PIXELS:
+            coverage = max(coverage, 1.0)
+
+    found["image_coverage"] = min(coverage, 1.0)
+    return found
+
+
+def classify_page(page):
+    """TEXT, SCANNED or BLANK for one pypdf page."""
+
+    try:
+        info = inspect_page(page)
+    except Exception as e:
+        print(f"   ⚠ Page not inspectable ({e}) → OCR")
+        return SCANNED
+
+    has_text = info["text_ops"] and info["glyphs"]
+
+    # An OCR'd scan carries an invisible text layer: Camelot can read it
+    if has_text and info["text_ops"] >= MIN_TEXT_OPS and info["fonts"]:
+        return TEXT
+
+    if info["image_coverage"] >= SCAN_COVERAGE:
+        return SCANNED
+
+    if has_text:
+        return TEXT
+
+    if info["images"]:
+        return SCANNED
+
+    return BLANK
+
+
+def classify_pdf(pdf, first_page=1, last_page=None):
+    """
+    Label of every page from first_page to last_page (1-based,
+    inclusive). `pdf` is a path or an open PDFSession, whose reader is
+    then reused. An unreadable file is labelled all-SCANNED, so it
+    still goes to OCR like it used to.
+    """
+
+    try:
+        reader = pdf.reader if hasattr(pdf, "reader") else PdfReader(pdf)
+        total = len(reader.pages)
+    except (PdfReadError, OSError, ValueError) as e:
+        print(f"   ⚠ Could not classify {getattr(pdf, 'path', pdf)}: {e}")
+        return {page: SCANNED for page in range(first_page, (last_page or first_page) + 1)}
+
+    last_page = min(last_page or total, total)
+
+    return {
+        number: classify_page(reader.pages[number - 1])
+        for number in range(first_page, last_page + 1)
+    }
+
+
+# ===============================
+# ROUTING HELPERS
+# ===============================
+
+def pages_labelled(labels, label):
+    return [page for page, page_label in labels.items() if page_label == label]
+
+
+def page_ranges(pages):
+    """[1, 2, 3, 5] -> "1-3,5" (Camelot / OCRmyPDF page syntax)."""
+
+    ranges = []
+
+    for page in sorted(pages):
+        if ranges and page == ranges[-1][1] + 1:
+            ranges[-1][1] = page
+        else:
+            ranges.append([page, page])
+
+    return ",".join(f"{a}-{b}" if a != b else str(a) for a, b in ranges)
+
+
+def parse_ranges(spec):
+    """"1-3,5" -> [1, 2, 3, 5]."""
+
+    pages = []
+
+    for part in spec.split(","):
+        first, _, last = part.strip().partition("-")
+        pages += range(int(first), int(last or first) + 1)
+
+    return pages
+
+
+def route_pages(pdf, last_page=None):
+    """(text pages for Camelot, scanned pages for OCR), 1-based."""
+
+    labels = classify_pdf(pdf, last_page=last_page)
+    return pages_labelled(labels, TEXT), pages_labelled(labels, SCANNED)
@@ -0,0 +1,114 @@
+import re
+import hashlib
+
+from pdf_session import PDFSession
+
+# ===============================
+# SETTINGS
+# ===============================
+
+MAX_FORM_DEPTH = 3     # Nested Form XObjects hashed
+DIGEST_CHARS = 32      # Hex characters kept of each half of a fingerprint
+
+WHITESPACE = re.compile(rb"\s+")
+
+
+# ===============================
+# PAGE FINGERPRINTS
+# ===============================
+
+def _raw_data(stream):
+    # The encoded bytes: hashing them needs no image decoding
+    return getattr(stream, "_data", b"") or b""
+
+
+def _xobject_digests(resources, depth=0):
+    """Digests of the images / forms a page draws, independent of their names."""
+
+    xobjects = resources.get("/XObject") if resources is not None else None
+    if xobjects is None:
+        return []
+
+    digests = []
+
+    for ref in xobjects.get_object().values():
+        xobject = ref.get_object()
+        digests.append(hashlib.sha256(_raw_data(xobject)).digest())
+
+        if xobject.get("/Subtype") == "/Form" and depth < MAX_FORM_DEPTH:
+            inner = xobject.get("/Resources")
+            digests += _xobject_digests(inner.get_object() if inner is not None else None, depth + 1)
+
+    return sorted(digests)
+
+
+def content_hash(page):
+    """
+    Content stream with whitespace normalised, plus the page geometry
+    and the bytes of every image / form it places.
+    """
+
+    hasher = hashlib.sha256()
+
+    contents = page.get_contents()
+    data = contents.get_data() if contents is not None else b""
+    hasher.update(WHITESPACE.sub(b" ", data).strip())
+
+    box = page.mediabox
+    hasher.update(f"|{float(box.width):.1f}x{float(box.height):.1f}|{page.get('/Rotate', 0)}|".encode())
+
+    resources = page.get("/Resources")
+    for digest in _xobject_digests(resources.get_object() if resources is not None else None):
+        hasher.update(digest)
+
+    return hasher.hexdigest()[:DIGEST_CHARS]
+
+
+def text_hash(text):
+    normalised = " ".join(text.split())
+    return hashlib.sha256(normalised.encode("utf-8")).hexdigest()[:DIGEST_CHARS]
+
+
+def page_fingerprint(doc, number):
+    """
+    "<content hash>-<text hash>" of one page of an open PDFSession, or
+    None when the page cannot be read.
+    """
+
+    try:
+        content = content_hash(doc.reader.pages[number - 1])
+        text = text_hash(doc.text_runs(number)[0])
+    except Exception as e:
+        print(f"   ⚠ Page {number} not fingerprinted ({e})")
+        return None
+
+    return f"{content}-{text}"
+
+
+def document_fingerprints(pdf):
+    """{page: fingerprint} of every page; `pdf` is a path or an open PDFSession."""
+
+    if isinstance(pdf, PDFSession):
+        return {n: page_fingerprint(pdf, n) for n in range(1, pdf.page_count + 1)}
+
+    with PDFSession(pdf) as doc:
+        return document_fingerprints(doc)
+
+
+# ===============================
+# REVISIONS
+# ===============================
+
+def compare_revisions(old_prints, new_prints):
+    """
+    (unchanged pages, changed pages) of a new revision, 1-based. A page
+    is unchanged when the old revision had an identical page anywhere,
+    so inserted or removed pages do not mark the rest as changed.
+    """
+
+    known = {fp for fp in old_prints.values() if fp}
+
+    unchanged = [page for page, fp in sorted(new_prints.items()) if fp in known]
+    changed = [page for page, fp in sorted(new_prints.items()) if fp not in known]
+
+    return unchanged, changed
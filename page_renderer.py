@@ -0,0 +1,132 @@
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+
+import pypdfium2 as pdfium
+
+from pdf_store import document_sha256
+
+# ===============================
+# SETTINGS
+# ===============================
+
+RASTER_DPI = 200      # pdf2image's default, so OCR output is unchanged
+CAMELOT_DPI = 300     # What camelot lattice asks Ghostscript for
+CACHE_MB = 256        # Rendered pages kept in memory per process (0 = none)
+
+
+# ===============================
+# RENDERING
+# ===============================
+
+def render(document, number, dpi=RASTER_DPI, colorspace="RGB"):
+    """
+    One page of an open pdfium document as a PIL image in `colorspace`
+    (a PIL mode). Always rendered in colour first, so "L" is exactly
+    what .convert("L") of the colour page gives.
+    """
+
+    page = document[number - 1]
+    try:
+        image = page.render(scale=dpi / 72).to_pil()
+    finally:
+        page.close()
+
+    return image if image.mode == colorspace else image.convert(colorspace)
+
+
+# ===============================
+# RASTER CACHE
+# ===============================
+
+class RasterCache:
+    """
+    Rendered pages keyed by (document sha256, page, dpi, colorspace),
+    least recently used dropped first once CACHE_MB is reached. Keyed by
+    content, so every open copy of a document shares its pages.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.images = OrderedDict()
+        self.size = 0
+
+    def get(self, key):
+        with self.lock:
+            image = self.images.get(key)
+            if image is not None:
+                self.images.move_to_end(key)
+            return image
+
+    def put(self, key, image):
+        nbytes = image.width * image.height * len(image.getbands())
+
+        with self.lock:
+            if key in self.images:
+                return
+
+            self.images[key] = image
+            self.size += nbytes
+
+            while self.images and self.size > CACHE_MB << 20:
+                _, old = self.images.popitem(last=False)
+                self.size -= old.width * old.height * len(old.getbands())
+
+    def clear(self):
+        with self.lock:
+            self.images.clear()
+            self.size = 0
+
+
+_cache = RasterCache()
+
+
+def raster_cache():
+    return _cache
+
+
+def rasterize(pdf_path, number, dpi=RASTER_DPI, colorspace="RGB", document=None, lock=None):
+    """
+    A page of a PDF as a PIL image, rendered in-process by pdfium and
+    cached. `document` / `lock` let an open PDFSession render through
+    its own (not thread-safe) pdfium handle.
+    """
+
+    key = (document_sha256(pdf_path), number, dpi, colorspace)
+
+    image = _cache.get(key)
+    if image is not None:
+        return image
+
+    if document is None:
+        document = pdfium.PdfDocument(pdf_path)
+        try:
+            image = render(document, number, dpi, colorspace)
+        finally:
+            document.close()
+    else:
+        with lock or nullcontext():
+            image = render(document, number, dpi, colorspace)
+
+    _cache.put(key, image)
+
+    return image
+
+
+# ===============================
+# CAMELOT BACKEND
+# ===============================
+
+class CamelotBackend:
+    """
+    camelot lattice `backend=`: the page camelot splits out is rendered
+    in-process instead of by a Ghostscript subprocess. Not cached - it
+    is a throwaway single-page file, rendered once.
+    """
+
+    def convert(self, pdf_path, png_path, resolution=CAMELOT_DPI):
+        document = pdfium.PdfDocument(pdf_path)
+        try:
+            render(document, 1, dpi=resolution).save(png_path)
+        finally:
+            document.close()
@@ -2,6 +2,8 @@ import requests
 import pandas as pd
 import os
 
+from crop_api_cache import install_response_cache
+
 # ============================================
 # OUTPUT SETTINGS
 # ============================================
@@ -23,13 +25,16 @@ headers = {
     "X-Requested-With": "XMLHttpRequest"
 }
 
+# Crop API responses come from the on-disk cache while fresh
+session = install_response_cache(requests.Session())
+
 # ============================================
 # STEP 1: GET ALL CROPS
 # ============================================
 
 print("🌾 Downloading Crop List...")
 
-crop_response = requests.get(CROP_LIST_URL, headers=headers)
+crop_response = session.get(CROP_LIST_URL, headers=headers)
 
 crop_list = crop_response.json()
 
@@ -52,7 +57,7 @@ for crop in crop_list:
         "cropId": crop_id
     }
 
-    r = requests.get(YEARLY_URL, params=payload, headers=headers)
+    r = session.get(YEARLY_URL, params=payload, headers=headers)
 
     try:
         data = r.json()
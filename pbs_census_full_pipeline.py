@@ -1,20 +1,35 @@
-import requests
-from bs4 import BeautifulSoup
 import os
 import pandas as pd
 import tabula
 
+from extraction_cache import cached_frames, report_revisions
+from page_classifier import page_ranges
+from pdf_downloader import download_pdfs
+from pdf_session import PDFSession
+from pipeline_runner import Pipeline
+from publications_crawler import crawl, pdf_links as pdf_links_for
+from table_prefilter import table_pages
+
 
 # ================================
 # SETTINGS
 # ================================
-BASE_URL = "https://www.pbs.gov.pk"
-PAGE_URL = "https://www.pbs.gov.pk/agriculture-census/"
-
 PDF_FOLDER = "PBS_Census_PDFs"
 CSV_FOLDER = "PBS_Census_CSV"
 CLEAN_FOLDER = "PBS_Census_CleanCSV"
 
+# With JPype installed (pip install jpype1) tabula-py runs Tabula inside
+# this process: the JVM starts once and every PDF streams through it,
+# instead of a new `java` subprocess (and class loading) per file.
+try:
+    import jpype  # noqa: F401
+    TABULA_IN_PROCESS = True
+except ImportError:
+    TABULA_IN_PROCESS = False
+
+# Only applied when the JVM starts, i.e. on the first read
+JAVA_OPTIONS = ["-Xmx2g", "-Djava.awt.headless=true"]
+
 os.makedirs(PDF_FOLDER, exist_ok=True)
 os.makedirs(CSV_FOLDER, exist_ok=True)
 os.makedirs(CLEAN_FOLDER, exist_ok=True)
@@ -25,92 +40,91 @@ os.makedirs(CLEAN_FOLDER, exist_ok=True)
 # ================================
 print("\n🔍 Scraping Agriculture Census page...")
 
-response = requests.get(PAGE_URL)
-soup = BeautifulSoup(response.text, "html.parser")
-
-pdf_links = []
-
-for a in soup.find_all("a"):
-    href = a.get("href")
-
-    if href and ".pdf" in href.lower():
-
-        # Convert relative → absolute URL
-        if href.startswith("/"):
-            href = BASE_URL + href
+crawl(["pbs_agri_census"])
 
-        pdf_links.append(href)
-
-pdf_links = list(set(pdf_links))  # remove duplicates
+pdf_links = sorted(pdf_links_for("pbs_agri_census"))  # stable order
 
 print(f"✅ Found {len(pdf_links)} PDF files.\n")
 
 
 # ================================
-# STEP 2: DOWNLOAD ALL PDFs
+# STEP 2: DOWNLOAD PDFs
 # ================================
-print("⬇️ Downloading PDFs...\n")
+def download_stage(emit):
+
+    # Files are named after their URL, so the same publication keeps
+    # the same name (and the same downstream CSVs) on every run.
+    revisions = []
+    download_pdfs(pdf_links, PDF_FOLDER, on_complete=emit, revisions=revisions)
+    report_revisions(revisions)
 
-for i, pdf_url in enumerate(pdf_links, start=1):
-    try:
-        file_name = f"Census_{i}.pdf"
-        file_path = os.path.join(PDF_FOLDER, file_name)
+    print("\n✅ All PDFs downloaded successfully!")
 
-        print(f"Downloading ({i}/{len(pdf_links)}): {file_name}")
 
-        pdf_data = requests.get(pdf_url).content
+# ================================
+# STEP 3: FIND TABLE PAGES
+# ================================
+def classify_pdf(pdf_path):
 
-        with open(file_path, "wb") as f:
-            f.write(pdf_data)
+    # Extract tables from the pages that look like they hold one
+    with PDFSession(pdf_path) as doc:
+        text_pages, _ = table_pages(doc)
 
-    except Exception as e:
-        print("❌ Failed:", pdf_url, e)
+    if not text_pages:
+        print("⚠️ No table pages in:", os.path.basename(pdf_path))
+        return None
 
-print("\n✅ All PDFs downloaded successfully!")
+    return pdf_path, text_pages
 
 
 # ================================
-# STEP 3: EXTRACT TABLES USING TABULA
+# STEP 4: EXTRACT TABLES USING TABULA
 # ================================
-print("\n📊 Extracting tables from PDFs...\n")
+def extract_pdf(plan):
 
-for pdf_file in os.listdir(PDF_FOLDER):
+    pdf_path, text_pages = plan
+    pdf_file = os.path.basename(pdf_path)
 
-    if pdf_file.endswith(".pdf"):
+    print("📄 Extracting:", pdf_file)
 
-        pdf_path = os.path.join(PDF_FOLDER, pdf_file)
+    pages = page_ranges(text_pages)
 
-        print("📄 Extracting:", pdf_file)
+    tables = cached_frames(
+        pdf_path, pages, "tabula", {"multiple_tables": True},
+        lambda: tabula.read_pdf(
+            pdf_path,
+            pages=pages,
+            multiple_tables=True,
+            java_options=JAVA_OPTIONS,
+            force_subprocess=not TABULA_IN_PROCESS
+        )
+    )
 
-        try:
-            # Extract tables from all pages
-            tables = tabula.read_pdf(pdf_path, pages="all", multiple_tables=True)
+    if not tables:
+        print("⚠️ No tables found in:", pdf_file)
+        return None
 
-            if not tables:
-                print("⚠️ No tables found in:", pdf_file)
-                continue
+    # Save each table separately
+    raw_csvs = []
 
-            # Save each table separately
-            for t, table in enumerate(tables, start=1):
+    for t, table in enumerate(tables, start=1):
 
-                raw_csv = os.path.join(
-                    CSV_FOLDER,
-                    pdf_file.replace(".pdf", f"_Table{t}.csv")
-                )
+        raw_csv = os.path.join(
+            CSV_FOLDER,
+            pdf_file.replace(".pdf", f"_Table{t}.csv")
+        )
 
-                table.to_csv(raw_csv, index=False)
+        table.to_csv(raw_csv, index=False)
+        raw_csvs.append(raw_csv)
 
-            print(f"✅ Extracted {len(tables)} tables from {pdf_file}")
+    print(f"✅ Extracted {len(tables)} tables from {pdf_file}")
 
-        except Exception as e:
-            print("❌ Extraction failed:", pdf_file, e)
+    return raw_csvs
 
 
 # ================================
-# STEP 4: AUTO CLEAN CSV TABLES
+# STEP 5: AUTO CLEAN CSV TABLES
 # ================================
-print("\n🧹 Cleaning extracted CSV tables...\n")
-
 def clean_dataframe(df):
 
     # Drop empty rows/cols
@@ -129,26 +143,45 @@ def clean_dataframe(df):
     return df
 
 
-for csv_file in os.listdir(CSV_FOLDER):
+def clean_csv(csv_path):
 
-    if csv_file.endswith(".csv"):
+    csv_file = os.path.basename(csv_path)
 
-        csv_path = os.path.join(CSV_FOLDER, csv_file)
+    df = pd.read_csv(csv_path)
 
-        try:
-            df = pd.read_csv(csv_path)
+    df_clean = clean_dataframe(df)
 
-            df_clean = clean_dataframe(df)
+    clean_path = os.path.join(CLEAN_FOLDER, csv_file)
 
-            clean_path = os.path.join(CLEAN_FOLDER, csv_file)
+    df_clean.to_csv(clean_path, index=False)
 
-            df_clean.to_csv(clean_path, index=False)
+    print("✅ Clean Saved:", csv_file)
 
-            print("✅ Clean Saved:", csv_file)
+    return clean_path
 
-        except Exception as e:
-            print("❌ Cleaning failed:", csv_file, e)
 
+# ================================
+# RUN: ALL STAGES AT ONCE
+# ================================
+# The first PDF is classified and extracted while the rest are still
+# downloading, and its tables are cleaned while the next PDF is in
+# Tabula. Tabula gets a single worker: it shares one JVM.
+if TABULA_IN_PROCESS:
+    print("⬇️ Downloading and extracting PDFs (one shared JVM)...\n")
+else:
+    print("⬇️ Downloading and extracting PDFs...")
+    print("⚠️ jpype1 not installed: one Java subprocess per PDF\n")
+
+pipeline = (
+    Pipeline(download_stage)
+    .stage("classify", classify_pdf, queue_size=0)
+    .stage("extract", extract_pdf, fan_out=True)
+    .stage("clean", clean_csv, workers=2)
+)
+
+clean_paths = list(pipeline.run())
+
+print(f"\n✅ Cleaned {len(clean_paths)} tables")
 
 print("\n🎉 PIPELINE COMPLETE!")
 print("📂 PDFs saved in:", PDF_FOLDER)
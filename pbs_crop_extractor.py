@@ -1,6 +1,8 @@
 import requests
 import pandas as pd
 
+from crop_api_cache import install_response_cache
+
 # API URL
 url = "https://na.data.gov.pk/Crops/GetYearly"
 
@@ -11,8 +13,9 @@ params = {
 
 print("Fetching data from PBS API...")
 
-# Send request
-response = requests.get(url, params=params)
+# Send request (served from the on-disk cache while fresh)
+session = install_response_cache(requests.Session())
+response = session.get(url, params=params)
 
 # Convert response JSON to Python list
 data = response.json()
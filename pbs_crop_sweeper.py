@@ -0,0 +1,166 @@
+import asyncio
+
+import aiohttp
+import pandas as pd
+
+from crop_api_cache import cached_get, finish_revalidation
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    import json
+    loads = json.loads
+
+# ============================================
+# SETTINGS
+# ============================================
+
+CROPS_URL = "https://na.data.gov.pk/Crops/GetCrops"
+YEARLY_URL = "https://na.data.gov.pk/Crops/GetYearly"
+
+OUTPUT_FILE = "PBS_ALL_CROPS_CLEAN.csv"
+
+MAX_CONCURRENCY = 8   # GetYearly requests in flight
+TIMEOUT = 60
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+    "Accept": "application/json, text/javascript, */*; q=0.01",
+    "Referer": "https://na.data.gov.pk/Crops/Home",
+    "X-Requested-With": "XMLHttpRequest",
+}
+
+# API field -> output column
+YEARLY_COLUMNS = {
+    "fiscalyear": "FiscalYear",
+    "production": "Production",
+    "area": "Area",
+    "yield": "Yield",
+}
+
+# Spellings of the crop fields seen in GetCrops responses, preferred first
+CROP_ID_KEYS = ("cropId", "CropId", "CropID", "id")
+CROP_NAME_KEYS = ("cropName", "CropName", "Name", "name")
+
+
+# ============================================
+# RESPONSE PARSING
+# ============================================
+
+def parse_json(body):
+    try:
+        data = loads(body)
+    except ValueError:
+        return None
+
+    # Sometimes response is wrapped
+    if isinstance(data, dict) and "data" in data:
+        data = data["data"]
+
+    return data
+
+
+def crop_key(crop):
+    # The first key that is set, not the first truthy value: cropId 0
+    # and an empty name are real values
+    crop_id = next((crop[k] for k in CROP_ID_KEYS if crop.get(k) is not None), None)
+    crop_name = next((crop[k] for k in CROP_NAME_KEYS if crop.get(k) is not None), None)
+    return crop_id, crop_name
+
+
+# ============================================
+# ASYNC SWEEP
+# ============================================
+
+async def _get_yearly(session, semaphore, crop_id, crop_name):
+    async with semaphore:
+        try:
+            status, body = await cached_get(session, YEARLY_URL, params={"cropId": crop_id})
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"❌ {crop_name}: {e}")
+            return crop_name, []
+
+    rows = parse_json(body) if status == 200 else None
+
+    if not isinstance(rows, list) or not rows:
+        print(f"⚠ No yearly data: {crop_name}")
+        return crop_name, []
+
+    print(f"✅ {crop_name}: {len(rows)} rows")
+    return crop_name, rows
+
+
+async def _sweep(concurrency):
+    timeout = aiohttp.ClientTimeout(total=TIMEOUT)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    async with aiohttp.ClientSession(headers=HEADERS, timeout=timeout, connector=connector) as session:
+
+        print("🔍 Fetching Crop List...")
+
+        status, body = await cached_get(session, CROPS_URL)
+        crops = parse_json(body) if status == 200 else None
+
+        if not isinstance(crops, list):
+            print("❌ Crop list request failed")
+            return []
+
+        print(f"✅ Total Crops Found: {len(crops)}")
+
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks = []
+
+        for crop in crops:
+            crop_id, crop_name = crop_key(crop)
+            if crop_id is None:
+                continue
+            tasks.append(_get_yearly(session, semaphore, crop_id, crop_name))
+
+        results = await asyncio.gather(*tasks)
+
+        # Stale cache hits were served at once; let their refresh land
+        await finish_revalidation()
+
+        return results
+
+
+# ============================================
+# BUILD + SAVE CLEAN CSV
+# ============================================
+
+def build_frame(results, year_column="FiscalYear"):
+    columns = dict(YEARLY_COLUMNS, fiscalyear=year_column)
+
+    records = [
+        dict(row, Crop=crop_name)
+        for crop_name, rows in results
+        for row in rows
+    ]
+
+    # One DataFrame construction for every crop at once
+    df = pd.DataFrame.from_records(records).rename(columns=columns)
+
+    return df.reindex(columns=["Crop", *columns.values()])
+
+
+def sweep_all_crops(output_file=OUTPUT_FILE, year_column="FiscalYear",
+                    concurrency=MAX_CONCURRENCY):
+
+    results = asyncio.run(_sweep(concurrency))
+
+    df = build_frame(results, year_column)
+    df.to_csv(output_file, index=False)
+
+    print("\n🎉 DONE!")
+    print(f"✅ File Saved: {output_file} ({len(df)} rows)")
+
+    return df
+
+
+# ============================================
+# RUN PROGRAM
+# ============================================
+
+if __name__ == "__main__":
+    sweep_all_crops()
@@ -1,13 +1,17 @@
 import os
-import time
+import queue
+import threading
 import pandas as pd
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import Select
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import Select, WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
 
+from pbs_xhr_replay import extract_all_crop_year_data_replay, parse_crop_table
+
 
 # ==========================================
 # PBS Crop × Year Extractor
@@ -17,108 +21,259 @@ URL = "https://na.data.gov.pk/Crops/Home"
 
 OUTPUT_FOLDER = "PBS_Crop_Data"
 
+# Replay the dropdown XHR over plain HTTP; the browser is only used
+# to (re)record it. Set False to force the full browser crawl.
+REPLAY_MODE = True
+
+BROWSER_WORKERS = 4    # Headless Chrome instances crawling in parallel
+MAX_ATTEMPTS = 3       # Tries per crop-year before giving up
+PAGE_TIMEOUT = 30      # Seconds to wait for the page / dropdowns
+TABLE_TIMEOUT = 20     # Seconds to wait for the table to refresh
+
+# Nothing on the page we need is an image, stylesheet or font
+BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.ico", "*.webp",
+    "*.css", "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+]
+
+# Empties the rows (the header and tbody stay, so a page that appends
+# to tbody still can), flags the table stale until the page touches it
+# again, and counts the AJAX requests that complete from here on
+STALE_MARKER_JS = """
+var table = document.getElementById('tblCropData');
+window.__tableRequests = 0;
+if (window.jQuery && !window.__tableHooked) {
+    jQuery(document).ajaxComplete(function () { window.__tableRequests++; });
+    window.__tableHooked = true;
+}
+if (table) {
+    table.querySelectorAll('tbody tr').forEach(function (tr) { tr.remove(); });
+    table.setAttribute('data-stale', '1');
+    new MutationObserver(function (changes, observer) {
+        table.removeAttribute('data-stale');
+        observer.disconnect();
+    }).observe(table, { childList: true, subtree: true });
+}
+"""
+
+# "rows" once the page has redrawn the table, "empty" when its request
+# came back and nothing was drawn (a crop-year without data), else false
+TABLE_READY_JS = """
+var table = document.getElementById('tblCropData');
+var idle = window.jQuery ? jQuery.active === 0 : true;
+if (!idle || !table) { return false; }
+if (!table.hasAttribute('data-stale')) { return 'rows'; }
+return window.__tableRequests > 0 ? 'empty' : false;
+"""
+
+AJAX_IDLE_JS = "return window.jQuery ? jQuery.active === 0 : true;"
+
+# Select by index and always fire `change` - Selenium's Select sends no
+# event when the option is already selected, and the table would never reload
+SELECT_JS = """
+var select = arguments[0];
+select.selectedIndex = arguments[1];
+select.dispatchEvent(new Event('change', { bubbles: true }));
+"""
+
+TABLE_HTML_JS = """
+var table = document.getElementById('tblCropData');
+return table ? table.outerHTML : null;
+"""
 
-def extract_all_crop_year_data():
 
-    print("🚀 Launching Chrome Browser...")
+# ==========================================
+# HEADLESS BROWSER
+# ==========================================
 
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install())
-    )
+def new_driver(driver_path):
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-extensions")
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.stylesheets": 2,
+        "profile.managed_default_content_settings.fonts": 2,
+    })
+
+    driver = webdriver.Chrome(service=Service(driver_path), options=options)
+
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
 
     driver.get(URL)
-    time.sleep(5)
 
-    # Create output folder
-    if not os.path.exists(OUTPUT_FOLDER):
-        os.makedirs(OUTPUT_FOLDER)
+    WebDriverWait(driver, PAGE_TIMEOUT).until(
+        EC.presence_of_element_located((By.ID, "YearId"))
+    )
 
-    # --------------------------------------
-    # Load Dropdowns
-    # --------------------------------------
+    return driver
 
-    crop_dropdown = Select(driver.find_element(By.ID, "CropId"))
-    year_dropdown = Select(driver.find_element(By.ID, "YearId"))
 
-    crops = crop_dropdown.options
-    years = year_dropdown.options
+def quit_driver(driver):
+    try:
+        if driver is not None:
+            driver.quit()
+    except Exception:
+        pass
 
-    print("🌾 Total Crops Found:", len(crops) - 1)
-    print("📅 Total Years Found:", len(years) - 1)
+
+def read_options(driver):
+    crops = [o.text.strip() for o in Select(driver.find_element(By.ID, "CropId")).options]
+    years = [o.text.strip() for o in Select(driver.find_element(By.ID, "YearId")).options]
+    return crops, years
+
+
+# ==========================================
+# ONE CROP-YEAR CELL
+# ==========================================
+
+def extract_cell(driver, state, crop_index, year_index, crop_name, year_value):
+
+    wait = WebDriverWait(driver, TABLE_TIMEOUT, poll_frequency=0.1)
+
+    if state.get("crop") != crop_index:
+        Select(driver.find_element(By.ID, "CropId")).select_by_index(crop_index)
+        wait.until(lambda d: d.execute_script(AJAX_IDLE_JS))
+        state["crop"] = crop_index
+
+    # Clear the current rows, then wait until the page has redrawn
+    # them or answered with nothing - instead of sleeping a fixed
+    # number of seconds.
+    driver.execute_script(STALE_MARKER_JS)
+    driver.execute_script(SELECT_JS, driver.find_element(By.ID, "YearId"), year_index)
+    ready = wait.until(lambda d: d.execute_script(TABLE_READY_JS))
 
     # --------------------------------------
-    # Loop Crops
+    # Extract Table (one WebDriver call, parsed locally)
     # --------------------------------------
 
-    for c in range(1, len(crops)):
+    extracted_data = []
+    if ready == "rows":
+        extracted_data = parse_crop_table(driver.execute_script(TABLE_HTML_JS))
 
-        crop_dropdown = Select(driver.find_element(By.ID, "CropId"))
-        crop_dropdown.select_by_index(c)
+    if not extracted_data:
+        # An answer, just an empty one - not worth another attempt
+        print(f"      ⚠ No data found: {crop_name} {year_value}")
+        return None
 
-        crop_name = crop_dropdown.options[c].text.strip()
-        crop_folder = os.path.join(OUTPUT_FOLDER, crop_name.replace(" ", "_"))
+    # Convert into DataFrame
+    df = pd.DataFrame(extracted_data)
 
-        if not os.path.exists(crop_folder):
-            os.makedirs(crop_folder)
+    # Save CSV
+    crop_folder = os.path.join(OUTPUT_FOLDER, crop_name.replace(" ", "_"))
+    os.makedirs(crop_folder, exist_ok=True)
 
-        print(f"\n🌾 Crop: {crop_name}")
+    filename = f"{crop_name}_{year_value}.csv"
+    filepath = os.path.join(
+        crop_folder,
+        filename.replace(" ", "_")
+    )
 
-        time.sleep(2)
+    df.to_csv(filepath, index=False)
 
-        # --------------------------------------
-        # Loop Years
-        # --------------------------------------
+    print("      ✅ Saved:", filepath)
+    return filepath
 
-        for y in range(1, len(years)):
 
-            year_dropdown = Select(driver.find_element(By.ID, "YearId"))
-            year_dropdown.select_by_index(y)
+# ==========================================
+# WORKER POOL
+# ==========================================
 
-            year_value = year_dropdown.options[y].text.strip()
+def browser_worker(worker_id, driver_path, tasks, crops, years, failed, no_data):
 
-            print(f"   📅 Year: {year_value}")
+    driver = None
+    state = {}
 
-            time.sleep(3)
+    try:
+        while True:
+            try:
+                crop_index, year_index, attempt = tasks.get_nowait()
+            except queue.Empty:
+                break
 
-            # --------------------------------------
-            # Extract Table
-            # --------------------------------------
+            crop_name, year_value = crops[crop_index], years[year_index]
 
             try:
-                table = driver.find_element(By.ID, "tblCropData")
-                rows = table.find_elements(By.TAG_NAME, "tr")
+                if driver is None:
+                    driver = new_driver(driver_path)
+                    state = {}
 
-                extracted_data = []
+                if extract_cell(driver, state, crop_index, year_index, crop_name, year_value) is None:
+                    no_data.append((crop_name, year_value))
 
-                for row in rows:
-                    cols = row.find_elements(By.TAG_NAME, "td")
-                    if cols:
-                        extracted_data.append(
-                            [c.text.strip() for c in cols]
-                        )
+            except Exception as e:
+                # Any failure - browser, parsing or disk - costs this pair
+                # one attempt, never the worker thread
+                print(f"      ❌ Worker {worker_id}: {crop_name} {year_value}: {type(e).__name__}: {e}")
 
-                if not extracted_data:
-                    print("      ⚠ No data found.")
-                    continue
+                # Restart the browser and put the pair back on the queue
+                quit_driver(driver)
+                driver = None
 
-                # Convert into DataFrame
-                df = pd.DataFrame(extracted_data)
+                if attempt + 1 < MAX_ATTEMPTS:
+                    tasks.put((crop_index, year_index, attempt + 1))
+                else:
+                    failed.append((crop_name, year_value))
 
-                # Save CSV
-                filename = f"{crop_name}_{year_value}.csv"
-                filepath = os.path.join(
-                    crop_folder,
-                    filename.replace(" ", "_")
-                )
+    finally:
+        quit_driver(driver)
 
-                df.to_csv(filepath, index=False)
 
-                print("      ✅ Saved:", filepath)
+def extract_all_crop_year_data():
 
-            except Exception as e:
-                print("      ❌ Table error:", e)
+    print(f"🚀 Launching {BROWSER_WORKERS} headless Chrome workers...")
 
+    driver_path = ChromeDriverManager().install()
+
+    os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+
+    # --------------------------------------
+    # Load Dropdowns
+    # --------------------------------------
+
+    driver = new_driver(driver_path)
+    crops, years = read_options(driver)
     driver.quit()
+
+    print("🌾 Total Crops Found:", len(crops) - 1)
+    print("📅 Total Years Found:", len(years) - 1)
+
+    # --------------------------------------
+    # Queue every (crop, year) pair
+    # --------------------------------------
+
+    tasks = queue.Queue()
+
+    for c in range(1, len(crops)):
+        for y in range(1, len(years)):
+            tasks.put((c, y, 0))
+
+    failed = []
+    no_data = []
+
+    workers = [
+        threading.Thread(
+            target=browser_worker,
+            args=(i + 1, driver_path, tasks, crops, years, failed, no_data)
+        )
+        for i in range(BROWSER_WORKERS)
+    ]
+
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    if no_data:
+        print(f"\nℹ {len(no_data)} crop-year pairs have no data on the site")
+
+    if failed:
+        print(f"\n⚠ {len(failed)} crop-year pairs failed after {MAX_ATTEMPTS} attempts:")
+        for crop_name, year_value in failed:
+            print(f"   - {crop_name} {year_value}")
+
     print("\n🎉 DONE! All Crop-Year CSV files saved successfully.")
 
 
@@ -127,4 +282,7 @@ def extract_all_crop_year_data():
 # ==========================================
 
 if __name__ == "__main__":
-    extract_all_crop_year_data()
+    if REPLAY_MODE:
+        extract_all_crop_year_data_replay()
+    else:
+        extract_all_crop_year_data()
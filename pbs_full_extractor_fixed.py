@@ -1,8 +1,12 @@
 import requests
 import pandas as pd
-import time
 
-session = requests.Session()
+from crop_api_cache import install_response_cache
+from rate_limiter import install_rate_limiter
+
+# Per-host token bucket instead of fixed sleeps between requests;
+# crop API responses come from the on-disk cache while fresh
+session = install_response_cache(install_rate_limiter(requests.Session()))
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
@@ -89,8 +93,6 @@ def extract_all_crops():
                 "Yield": row.get("yield")
             })
 
-        time.sleep(0.3)
-
     df = pd.DataFrame(all_rows)
     df.to_csv("PBS_ALL_CROPS_FINAL.csv", index=False)
 
@@ -0,0 +1,362 @@
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit, urlunsplit
+
+import requests
+import pandas as pd
+from lxml import html as lxml_html
+
+from http_fetch import resolve_url
+from rate_limiter import install_rate_limiter
+
+# ==========================================
+# SETTINGS
+# ==========================================
+
+URL = "https://na.data.gov.pk/Crops/Home"
+
+OUTPUT_FOLDER = "PBS_Crop_Data"
+SIGNATURE_FILE = "pbs_crop_xhr_signature.json"
+
+MAX_WORKERS = 8         # Replayed requests in flight
+RECORD_WAIT = 10        # Seconds to wait for the dropdown XHR while recording
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+    "Referer": URL,
+    "X-Requested-With": "XMLHttpRequest",
+}
+
+
+class ReplaySignatureError(Exception):
+    """The recorded request no longer produces a crop table."""
+
+
+# ==========================================
+# TABLE PARSING (lxml)
+# ==========================================
+
+def parse_crop_table(markup):
+    """
+    Rows of td text from tblCropData. Accepts a full page, the table's
+    outerHTML or a bare fragment of <tr> rows. Returns None for anything
+    else - an error or layout page with some other table is not crop
+    data, it means the request has to be re-recorded.
+    """
+
+    if not markup or not markup.strip():
+        return None
+
+    root = lxml_html.fromstring(f"<div>{markup}</div>")
+
+    tables = root.xpath("//table[@id='tblCropData']")
+
+    if not tables and root.xpath("//table"):
+        return None
+
+    container = tables[0] if tables else root
+
+    rows = container.xpath(".//tr")
+    if not tables and not rows:
+        return None
+
+    # Whitespace collapsed the way WebElement.text renders it
+    return [
+        [" ".join(td.text_content().split()) for td in tr.xpath("./td")]
+        for tr in rows
+        if tr.xpath("./td")
+    ]
+
+
+def parse_json_rows(body):
+    data = json.loads(body)
+
+    if isinstance(data, dict):
+        # Wrapped response - either a list of rows or an HTML fragment
+        for key in ("data", "Data", "rows", "html", "Html"):
+            if key in data:
+                data = data[key]
+                break
+
+    if isinstance(data, str):
+        return parse_crop_table(data)
+
+    if isinstance(data, list):
+        return [
+            list(row.values()) if isinstance(row, dict) else list(row)
+            for row in data
+        ]
+
+    return None
+
+
+# ==========================================
+# DROPDOWN OPTIONS (no browser)
+# ==========================================
+
+def read_dropdowns(page_html):
+    root = lxml_html.fromstring(page_html)
+
+    def options(select_id):
+        return [
+            [opt.get("value"), opt.text_content().strip()]
+            for opt in root.xpath(f"//select[@id='{select_id}']/option")
+            if opt.get("value")
+        ]
+
+    return options("CropId"), options("YearId")
+
+
+# ==========================================
+# RECORD (one browser session)
+# ==========================================
+
+def _find_key(fields, value):
+    for key, field_value in fields.items():
+        if str(field_value) == str(value):
+            return key
+    return None
+
+
+def _parse_request(request):
+    parts = urlsplit(request["url"])
+    params = dict(parse_qsl(parts.query, keep_blank_values=True))
+
+    post_data = request.get("postData")
+    data, is_json = None, False
+
+    if post_data:
+        try:
+            data, is_json = json.loads(post_data), True
+        except ValueError:
+            data = dict(parse_qsl(post_data, keep_blank_values=True))
+
+    base_url = urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+    return base_url, params, data, is_json
+
+
+def record_signature():
+    """
+    Drive the page once, select a crop and a year, and keep the XHR
+    those dropdowns fire as the replay signature.
+    """
+
+    # Only needed when the endpoints have to be rediscovered
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import Select
+    from webdriver_manager.chrome import ChromeDriverManager
+    from selenium.webdriver.chrome.service import Service
+
+    print("🎥 Recording crop×year XHR signature...")
+
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+    driver = webdriver.Chrome(
+        service=Service(ChromeDriverManager().install()),
+        options=options
+    )
+
+    try:
+        driver.get(URL)
+        crops, years = read_dropdowns(driver.page_source)
+
+        if not crops or not years:
+            raise ReplaySignatureError("CropId / YearId dropdowns not found")
+
+        crop_value, year_value = crops[0][0], years[0][0]
+
+        driver.get_log("performance")  # discard page-load traffic
+
+        Select(driver.find_element(By.ID, "CropId")).select_by_value(crop_value)
+        Select(driver.find_element(By.ID, "YearId")).select_by_value(year_value)
+
+        deadline = time.time() + RECORD_WAIT
+
+        while time.time() < deadline:
+            for entry in driver.get_log("performance"):
+                message = json.loads(entry["message"])["message"]
+
+                if message.get("method") != "Network.requestWillBeSent":
+                    continue
+                if message["params"].get("type") not in ("XHR", "Fetch"):
+                    continue
+
+                request = message["params"]["request"]
+                base_url, params, data, is_json = _parse_request(request)
+
+                fields = dict(params, **(data if isinstance(data, dict) else {}))
+                crop_key = _find_key(fields, crop_value)
+                year_key = _find_key(fields, year_value)
+
+                if crop_key and year_key:
+                    signature = {
+                        "method": request["method"],
+                        "url": base_url,
+                        "params": params,
+                        "data": data,
+                        "json": is_json,
+                        "crop_key": crop_key,
+                        "year_key": year_key,
+                        "content_type": request["headers"].get("Content-Type"),
+                        "crops": crops,
+                        "years": years,
+                        "recorded": time.time(),
+                    }
+
+                    with open(SIGNATURE_FILE, "w", encoding="utf-8") as f:
+                        json.dump(signature, f, indent=2)
+
+                    print(f"✅ Signature saved: {request['method']} {base_url}")
+                    return signature
+
+            time.sleep(0.5)
+
+        raise ReplaySignatureError("No XHR carried both the crop and year values")
+
+    finally:
+        driver.quit()
+
+
+def load_signature():
+    if not os.path.exists(SIGNATURE_FILE):
+        return None
+
+    with open(SIGNATURE_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# ==========================================
+# REPLAY (plain HTTP)
+# ==========================================
+
+def replay_cell(session, signature, crop_value, year_value):
+    params = dict(signature["params"])
+    data = signature["data"]
+
+    if isinstance(data, dict):
+        data = dict(data)
+
+    for key, value in ((signature["crop_key"], crop_value), (signature["year_key"], year_value)):
+        if key in params:
+            params[key] = value
+        else:
+            data[key] = value
+
+    kwargs = {"params": params}
+
+    if data is not None:
+        if signature["json"]:
+            kwargs["json"] = data
+        else:
+            kwargs["data"] = data
+
+    r = session.request(signature["method"], signature["url"], **kwargs)
+
+    if r.status_code != 200:
+        raise ReplaySignatureError(f"HTTP {r.status_code} from {signature['url']}")
+
+    try:
+        rows = parse_json_rows(r.text)
+    except ValueError:
+        rows = parse_crop_table(r.text)
+
+    if rows is None:
+        raise ReplaySignatureError("Response holds no crop table")
+
+    return rows
+
+
+def save_cell(crop_name, year_value, rows):
+    crop_folder = os.path.join(OUTPUT_FOLDER, crop_name.replace(" ", "_"))
+    os.makedirs(crop_folder, exist_ok=True)
+
+    filename = f"{crop_name}_{year_value}.csv"
+    filepath = os.path.join(crop_folder, filename.replace(" ", "_"))
+
+    pd.DataFrame(rows).to_csv(filepath, index=False)
+
+    return filepath
+
+
+def replay_session(signature):
+    """Rate-limited session carrying the recorded request's headers."""
+
+    session = install_rate_limiter(requests.Session())
+    session.headers.update(HEADERS)
+
+    if signature.get("content_type") and not signature["json"]:
+        session.headers["Content-Type"] = signature["content_type"]
+
+    return session
+
+
+def _replay_all(session, signature, crops, years):
+    pairs = [(crop, year) for crop in crops for year in years]
+
+    def run(pair):
+        (crop_value, crop_name), (year_value, year_text) = pair
+
+        rows = replay_cell(session, signature, crop_value, year_value)
+
+        if not rows:
+            print(f"   ⚠ No data found: {crop_name} {year_text}")
+            return None
+
+        return save_cell(crop_name, year_text, rows)
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        saved = [p for p in executor.map(run, pairs) if p]
+
+    print(f"\n✅ Saved {len(saved)} crop-year CSV files")
+    return saved
+
+
+def extract_all_crop_year_data_replay():
+    """
+    Crop×year sweep without a browser. The browser is only launched
+    to (re)record the signature when there is none or it has broken.
+    """
+
+    os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+
+    signature = load_signature()
+
+    for attempt in range(2):
+
+        if signature is None:
+            signature = record_signature()
+
+        session = replay_session(signature)
+
+        # Fresh option lists if the page can be read without a browser -
+        # requested as a normal page load, not as the XHR
+        crops, years = signature["crops"], signature["years"]
+        try:
+            page = session.get(
+                resolve_url(URL),
+                headers={"X-Requested-With": None, "Content-Type": None}
+            )
+            live_crops, live_years = read_dropdowns(page.text)
+            crops, years = live_crops or crops, live_years or years
+        except requests.RequestException:
+            pass
+
+        print(f"🌾 Crops: {len(crops)}  📅 Years: {len(years)}")
+
+        try:
+            return _replay_all(session, signature, crops, years)
+
+        except ReplaySignatureError as e:
+            print(f"⚠ Replay signature broken ({e}) → re-recording")
+            signature = None
+
+    raise ReplaySignatureError("Replay failed even after re-recording")
+
+
+if __name__ == "__main__":
+    extract_all_crop_year_data_replay()
@@ -0,0 +1,417 @@
+import os
+import json
+import time
+import base64
+import asyncio
+import hashlib
+from email.utils import formatdate
+
+import aiohttp
+
+from http_fetch import resolve_url
+from pdf_store import INDEX_FILE, TMP_FOLDER, add_blob, has_blob, ingest_file, link_blob
+
+# ===============================
+# SETTINGS
+# ===============================
+
+MAX_CONCURRENCY = 16   # Total downloads in flight
+MAX_PER_HOST = 6       # Pooled keep-alive connections per host
+TIMEOUT = 600          # Seconds allowed per file
+CHUNK_SIZE = 1 << 20   # 1 MiB read/write chunks
+
+PART_SUFFIX = ".part"
+VALIDATORS_SUFFIX = ".json"   # ETag / Last-Modified of the file a .part belongs to
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+    # Keep Content-Length comparable with the bytes written to disk
+    "Accept-Encoding": "identity",
+}
+
+
+# ===============================
+# FILE NAMING
+# ===============================
+
+def pdf_filename(url):
+    return url.split("/")[-1].replace("%20", "_")
+
+
+def _url_tag(url):
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:10]
+
+
+def unique_filenames(urls):
+    """
+    Stable names taken from the URL itself. Different links that share a
+    basename get a short URL tag so they never overwrite each other.
+    """
+
+    names = [pdf_filename(url) for url in urls]
+    owners = {}
+
+    for url, name in zip(urls, names):
+        owners.setdefault(name, set()).add(url)
+
+    unique = []
+
+    for url, name in zip(urls, names):
+        if len(owners[name]) > 1:
+            stem, ext = os.path.splitext(name)
+            name = f"{stem}_{_url_tag(url)}{ext}"
+        unique.append(name)
+
+    return unique
+
+
+# ===============================
+# DOWNLOAD MANIFEST
+# ===============================
+
+def load_manifest(path=INDEX_FILE):
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path=INDEX_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    os.replace(tmp, path)
+
+
+def conditional_headers(entry, filepath, skip_existing):
+    """
+    Validators for a conditional GET, or None when the file has to be
+    fetched in full.
+    """
+
+    # A stored blob is enough - the link under `filepath` can be
+    # (re)created from it without downloading anything.
+    if entry and has_blob(entry.get("sha256")):
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        if headers:
+            return headers
+
+    # File from before the store existed: trust its mtime
+    if skip_existing and os.path.exists(filepath):
+        mtime = os.path.getmtime(filepath)
+        return {"If-Modified-Since": formatdate(mtime, usegmt=True)}
+
+    return None
+
+
+# ===============================
+# STREAMING + ATOMIC COMMIT
+# ===============================
+
+def part_path(url):
+    # Keyed by URL so a partial file is only ever resumed from the link
+    # that produced it.
+    return os.path.join(TMP_FOLDER, _url_tag(url) + PART_SUFFIX)
+
+
+def _part_validators(part):
+    path = part + VALIDATORS_SUFFIX
+
+    if not os.path.exists(path):
+        return {}
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except ValueError:
+        return {}
+
+
+def _save_part_validators(part, response):
+    with open(part + VALIDATORS_SUFFIX, "w", encoding="utf-8") as f:
+        json.dump({
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }, f)
+
+
+def _discard_part(part):
+    for path in (part, part + VALIDATORS_SUFFIX):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _if_range(validators):
+    # If-Range needs a strong validator - a weak ETag does not promise
+    # the bytes are the same
+    etag = validators.get("etag")
+    if etag and not etag.startswith("W/"):
+        return etag
+
+    return validators.get("last_modified")
+
+
+def _same_file(validators, response):
+    # For servers that ignore If-Range and answer 206 anyway
+    for field, header in (("etag", "ETag"), ("last_modified", "Last-Modified")):
+        if validators.get(field) and response.headers.get(header):
+            return validators[field] == response.headers[header]
+
+    return True
+
+
+def _hash_file(path, hasher):
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            hasher.update(chunk)
+
+
+def _expected_size(response, offset):
+    if response.status == 206:
+        content_range = response.headers.get("Content-Range", "")
+        total = content_range.rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+
+    if response.content_length is not None:
+        return offset + response.content_length
+
+    return None
+
+
+def _check_digest(response, hasher):
+    # Only a few servers send one; a sha-256 of the whole file (also on a
+    # 206 - the digest is of the full representation, not the range) is
+    # checked when present, otherwise the size check has to do.
+    digests = response.headers.get("Repr-Digest", "") + "," + response.headers.get("Digest", "")
+
+    for item in digests.split(","):
+        algo, _, value = item.strip().partition("=")
+        value = value.strip(":")
+        if algo.lower() == "sha-256" and value:
+            actual = base64.b64encode(hasher.digest()).decode("ascii")
+            if actual != value:
+                raise IOError(f"sha-256 mismatch (expected {value}, got {actual})")
+
+
+async def _stream_to_part(session, url, part, validators=None):
+    """
+    Stream `url` into `part`. Returns None on 304 Not Modified,
+    otherwise the new manifest fields for the file.
+
+    A partial file is only resumed with If-Range on the ETag /
+    Last-Modified it was started from, so a file changed on the server
+    in between is fetched again from zero instead of being appended to
+    the old bytes.
+    """
+
+    offset = os.path.getsize(part) if os.path.exists(part) else 0
+    part_validators = _part_validators(part)
+    if_range = _if_range(part_validators) if offset else None
+
+    if if_range:
+        headers = {"Range": f"bytes={offset}-", "If-Range": if_range}
+    else:
+        # Nothing to prove the part is still the same file
+        _discard_part(part)
+        offset = 0
+        headers = dict(validators or {})
+
+    async with session.get(resolve_url(url), headers=headers) as r:
+
+        if r.status == 304:
+            return None
+
+        if r.status == 416:
+            # Part file is already complete (or stale) - start over
+            _discard_part(part)
+            return await _stream_to_part(session, url, part, validators)
+
+        r.raise_for_status()
+
+        if offset and r.status == 206 and not _same_file(part_validators, r):
+            _discard_part(part)
+            return await _stream_to_part(session, url, part, validators)
+
+        if offset and r.status != 206:
+            # Changed on the server (If-Range failed) or Range ignored:
+            # the full file follows and replaces the part
+            offset = 0
+
+        if not offset:
+            _save_part_validators(part, r)
+
+        hasher = hashlib.sha256()
+
+        if offset:
+            print(f"↻ Resuming at {offset:,} bytes: {os.path.basename(part)}")
+            _hash_file(part, hasher)
+
+        expected = _expected_size(r, offset)
+
+        with open(part, "ab" if offset else "wb") as f:
+            async for chunk in r.content.iter_chunked(CHUNK_SIZE):
+                f.write(chunk)
+                hasher.update(chunk)
+
+        size = os.path.getsize(part)
+
+        if expected is not None and size != expected:
+            if size > expected:
+                _discard_part(part)
+            raise IOError(f"size mismatch (expected {expected:,}, got {size:,} bytes)")
+
+        try:
+            _check_digest(r, hasher)
+        except IOError:
+            _discard_part(part)
+            raise
+
+        os.remove(part + VALIDATORS_SUFFIX)
+
+        return {
+            "etag": r.headers.get("ETag"),
+            "last_modified": r.headers.get("Last-Modified"),
+            "size": size,
+            "sha256": hasher.hexdigest(),
+        }
+
+
+# ===============================
+# ASYNC DOWNLOAD
+# ===============================
+
+async def _download_one(session, semaphore, manifest, revisions, url, filepath, skip_existing,
+                        on_complete):
+
+    filename = os.path.basename(filepath)
+    entry = manifest.get(url)
+
+    # Blobs only ever enter the store after a complete, verified
+    # download, so a stored file only needs revalidating.
+    validators = conditional_headers(entry, filepath, skip_existing)
+
+    async with semaphore:
+
+        part = part_path(url)
+
+        try:
+            fields = await _stream_to_part(session, url, part, validators)
+
+            if fields is None:
+                print(f"✔ Unchanged: {filename}")
+
+                if entry and has_blob(entry.get("sha256")):
+                    link_blob(entry["sha256"], filepath)
+                else:
+                    sha256 = ingest_file(filepath)
+                    entry = {"sha256": sha256, "size": os.path.getsize(filepath)}
+
+            else:
+                add_blob(part, fields["sha256"])
+                link_blob(fields["sha256"], filepath)
+                print(f"⬇ Downloaded: {filename} ({fields['size']:,} bytes)")
+
+                # A re-issued publication: the old revision stays in the store
+                if entry and has_blob(entry.get("sha256")) and entry["sha256"] != fields["sha256"]:
+                    revisions.append((filepath, entry["sha256"]))
+
+                entry = dict(fields, paths=(entry or {}).get("paths", []))
+
+            if filepath not in entry.setdefault("paths", []):
+                entry["paths"].append(filepath)
+
+            entry["checked"] = time.time()
+            manifest[url] = entry
+
+            if on_complete is not None:
+                on_complete(filepath)
+
+            return filepath
+
+        except Exception as e:
+            # The .part file is kept so the next run resumes it
+            print(f"❌ Failed: {url} {e}")
+            return None
+
+
+async def _download_all(jobs, manifest, revisions, concurrency, per_host, skip_existing,
+                        on_complete):
+
+    # One pooled session for the whole batch: TCP/TLS connections are
+    # reused per host instead of being re-opened for every file.
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host)
+    timeout = aiohttp.ClientTimeout(total=TIMEOUT)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        headers=HEADERS
+    ) as session:
+
+        tasks = [
+            _download_one(
+                session, semaphore, manifest, revisions, url, filepath, skip_existing, on_complete
+            )
+            for url, filepath in jobs
+        ]
+
+        return await asyncio.gather(*tasks)
+
+
+def download_pdfs(urls, folder, filenames=None, concurrency=MAX_CONCURRENCY,
+                  per_host=MAX_PER_HOST, skip_existing=True, on_complete=None,
+                  revisions=None):
+    """
+    Download every URL into `folder` concurrently. Files already
+    recorded in the manifest are revalidated with a conditional GET
+    and only re-fetched when the server reports a change.
+
+    Content lives once in the sha256-addressed PDF store; the files in
+    `folder` are links to it.
+
+    on_complete(path) is called as each file lands, so the next stage
+    can start on it while the rest are still downloading. It runs on
+    the download loop and should only hand the path on.
+
+    (path, previous sha256) of every re-issued PDF is appended to
+    `revisions`, for extraction_cache.report_revisions().
+
+    Returns the local paths in the same order as `urls`
+    (None for downloads that failed).
+    """
+
+    os.makedirs(folder, exist_ok=True)
+    os.makedirs(TMP_FOLDER, exist_ok=True)
+
+    if filenames is None:
+        filenames = unique_filenames(urls)
+
+    paths = [os.path.join(folder, name) for name in filenames]
+
+    # The same link often appears more than once on a listing page
+    jobs = list(dict.fromkeys(zip(urls, paths)))
+
+    manifest = load_manifest()
+
+    if revisions is None:
+        revisions = []
+
+    try:
+        results = asyncio.run(
+            _download_all(jobs, manifest, revisions, concurrency, per_host, skip_existing, on_complete)
+        )
+    finally:
+        save_manifest(manifest)
+
+    done = dict(zip(jobs, results))
+
+    return [done[job] for job in zip(urls, paths)]
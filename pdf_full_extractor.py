@@ -1,9 +1,10 @@
 import os
-import camelot
-import pytesseract
-from pdf2image import convert_from_path
 import pandas as pd
 
+import extraction_engine
+from ocr_engine import ocr_pages
+from pdf_session import PDFSession
+
 
 PDF_FILE = "report.pdf"
 OUTPUT_FOLDER = "Extracted_Data"
@@ -17,12 +18,17 @@ os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 def extract_tables():
     print("📌 Extracting tables using Camelot...")
 
-    tables = camelot.read_pdf(PDF_FILE, pages="all")
+    plans = extraction_engine.plan_pdfs([PDF_FILE])
+
+    if not plans[0][1]:
+        print("⚠ No table pages found.")
+        return
 
-    print("✅ Tables Found:", tables.n)
+    tables = [df for _, _, _, df in extraction_engine.extract_tables(plans)]
 
-    for i, table in enumerate(tables):
-        df = table.df
+    print("✅ Tables Found:", len(tables))
+
+    for i, df in enumerate(tables):
 
         file_name = f"table_{i+1}.csv"
         df.to_csv(os.path.join(OUTPUT_FOLDER, file_name),
@@ -37,16 +43,17 @@ def extract_tables():
 def extract_text_ocr():
     print("\n📌 Running OCR on scanned pages...")
 
-    images = convert_from_path(PDF_FILE)
-
     all_text = ""
 
-    for i, img in enumerate(images):
-        print("🔍 OCR Page:", i + 1)
+    with PDFSession(PDF_FILE) as doc:
+        page_count = doc.page_count
 
-        text = pytesseract.image_to_string(img)
+    # Pages are rendered one at a time per worker, only when their
+    # text is not cached yet
+    for page, text in ocr_pages(PDF_FILE, range(1, page_count + 1)):
+        print("🔍 OCR Page:", page)
 
-        all_text += f"\n\n--- PAGE {i+1} ---\n{text}"
+        all_text += f"\n\n--- PAGE {page} ---\n{text}"
 
     with open(os.path.join(OUTPUT_FOLDER, "full_text.txt"),
               "w", encoding="utf-8") as f:
@@ -0,0 +1,144 @@
+import threading
+
+import pdfplumber
+import pypdfium2 as pdfium
+from pypdf import PdfReader
+
+from page_renderer import RASTER_DPI, rasterize
+
+# ===============================
+# SETTINGS
+# ===============================
+
+LAYOUT_OBJECTS = ("chars", "lines", "rects")
+
+
+# ===============================
+# PARSE-ONCE DOCUMENT
+# ===============================
+
+class PDFSession:
+    """
+    One PDF, parsed once and shared by every stage.
+
+    The pypdf reader (page labels), the pdfplumber document (text and
+    layout objects) and the pdfium document (rasters) are each opened on
+    first use and then reused; per-page results are cached so detection,
+    table extraction and OCR never parse the same page twice. Rasters
+    live in the process-wide page_renderer cache.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+        self._reader = None
+        self._plumber = None
+        self._pdfium = None
+
+        self._text = {}
+        self._objects = {}
+        self._runs = {}
+
+        # pdfium is not thread-safe
+        self._render_lock = threading.Lock()
+
+    # -------------------------------
+    # Parsers (opened lazily)
+    # -------------------------------
+
+    @property
+    def reader(self):
+        if self._reader is None:
+            self._reader = PdfReader(self.path)
+        return self._reader
+
+    @property
+    def plumber(self):
+        if self._plumber is None:
+            self._plumber = pdfplumber.open(self.path)
+        return self._plumber
+
+    @property
+    def pdfium(self):
+        if self._pdfium is None:
+            self._pdfium = pdfium.PdfDocument(self.path)
+        return self._pdfium
+
+    @property
+    def page_count(self):
+        return len(self.reader.pages)
+
+    # -------------------------------
+    # Per-page views (1-based page numbers)
+    # -------------------------------
+
+    def _layout(self, number):
+        page = self.plumber.pages[number - 1]
+
+        self._text[number] = page.extract_text() or ""
+        self._objects[number] = {name: getattr(page, name) for name in LAYOUT_OBJECTS}
+
+        # The parsed layout is now cached here; let pdfplumber drop its copy
+        page.close()
+
+    def text(self, number):
+        if number not in self._text:
+            self._layout(number)
+        return self._text[number]
+
+    def objects(self, number):
+        """{"chars": [...], "lines": [...], "rects": [...]} of one page."""
+
+        if number not in self._objects:
+            self._layout(number)
+        return self._objects[number]
+
+    def text_runs(self, number):
+        """
+        (page text, [(left, bottom, right, top), ...] text runs) from
+        pdfium - no layout analysis, about a millisecond per page.
+        """
+
+        if number not in self._runs:
+            with self._render_lock:
+                page = self.pdfium[number - 1]
+                textpage = page.get_textpage()
+                try:
+                    self._runs[number] = (
+                        textpage.get_text_range(),
+                        [textpage.get_rect(i) for i in range(textpage.count_rects())],
+                    )
+                finally:
+                    textpage.close()
+                    page.close()
+
+        return self._runs[number]
+
+    def raster(self, number, dpi=RASTER_DPI, colorspace="RGB"):
+        """The page rendered to a PIL image in `colorspace` (a PIL mode)."""
+
+        return rasterize(
+            self.path, number, dpi, colorspace,
+            document=self.pdfium, lock=self._render_lock
+        )
+
+    # -------------------------------
+    # Lifetime
+    # -------------------------------
+
+    def close(self):
+        if self._plumber is not None:
+            self._plumber.close()
+        if self._pdfium is not None:
+            self._pdfium.close()
+
+        self._reader = self._plumber = self._pdfium = None
+        self._text.clear()
+        self._objects.clear()
+        self._runs.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
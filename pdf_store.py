@@ -0,0 +1,171 @@
+import os
+import shutil
+import hashlib
+
+# ===============================
+# SETTINGS
+# ===============================
+
+STORE_FOLDER = "PDF_Store"
+
+BLOB_FOLDER = os.path.join(STORE_FOLDER, "blobs")
+TMP_FOLDER = os.path.join(STORE_FOLDER, "tmp")
+
+# URL -> ETag / Last-Modified / size / sha256 / linked paths
+INDEX_FILE = os.path.join(STORE_FOLDER, "index.json")
+
+CHUNK_SIZE = 1 << 20
+
+
+# ===============================
+# HASHING
+# ===============================
+
+def file_sha256(path):
+    hasher = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            hasher.update(chunk)
+
+    return hasher.hexdigest()
+
+
+_digests = {}
+
+
+def document_sha256(path):
+    """
+    sha256 of a PDF's content. Files linked from the PDF_Store carry it
+    in their blob name; anything else is hashed once per (size, mtime).
+    """
+
+    real = os.path.realpath(path)
+
+    if os.path.dirname(os.path.dirname(real)) == os.path.realpath(BLOB_FOLDER):
+        return os.path.splitext(os.path.basename(real))[0]
+
+    st = os.stat(real)
+    key = (real, st.st_size, st.st_mtime_ns)
+
+    if key not in _digests:
+        _digests[key] = file_sha256(real)
+
+    return _digests[key]
+
+
+# ===============================
+# BLOBS
+# ===============================
+
+def blob_path(sha256):
+    return os.path.join(BLOB_FOLDER, sha256[:2], sha256 + ".pdf")
+
+
+def has_blob(sha256):
+    return bool(sha256) and os.path.exists(blob_path(sha256))
+
+
+def add_blob(src_path, sha256=None):
+    """
+    Move a finished file into the store under its sha256.
+    If the same content is already stored the new copy is dropped.
+    Returns the sha256.
+    """
+
+    if sha256 is None:
+        sha256 = file_sha256(src_path)
+
+    blob = blob_path(sha256)
+
+    if os.path.exists(blob):
+        os.remove(src_path)
+    else:
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        os.replace(src_path, blob)
+
+    return sha256
+
+
+# ===============================
+# HUMAN-READABLE LINKS
+# ===============================
+
+def link_blob(sha256, dest):
+    """
+    Point `dest` (e.g. MNFSR_PDFs/AFR2024-25.pdf) at a stored blob.
+    Uses a symlink, then a hard link, then a plain copy - symlinks
+    need extra privileges on Windows.
+    """
+
+    blob = blob_path(sha256)
+
+    if os.path.lexists(dest):
+        if os.path.exists(dest) and os.path.samefile(dest, blob):
+            return dest
+        os.remove(dest)
+
+    os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+
+    try:
+        os.symlink(os.path.relpath(blob, os.path.dirname(dest) or "."), dest)
+    except (OSError, NotImplementedError):
+        try:
+            os.link(blob, dest)
+        except OSError:
+            shutil.copyfile(blob, dest)
+
+    return dest
+
+
+def ingest_file(path):
+    """
+    Adopt a file downloaded before the store existed: move it into the
+    store and leave a link behind under the same name.
+    """
+
+    if os.path.islink(path):
+        return file_sha256(path)
+
+    sha256 = file_sha256(path)
+    tmp = os.path.join(TMP_FOLDER, sha256 + ".ingest")
+
+    os.makedirs(TMP_FOLDER, exist_ok=True)
+    os.replace(path, tmp)
+
+    add_blob(tmp, sha256)
+    link_blob(sha256, path)
+
+    return sha256
+
+
+# ===============================
+# LISTING
+# ===============================
+
+def list_pdfs(folder):
+    """
+    PDF paths in `folder`, sorted, with each document reported only
+    once - whether its copies are links to the same stored blob or the
+    same file saved under two names.
+    """
+
+    seen = set()
+    pdf_files = []
+
+    for name in sorted(os.listdir(folder)):
+
+        path = os.path.join(folder, name)
+
+        if not name.lower().endswith(".pdf") or not os.path.exists(path):
+            continue
+
+        sha256 = document_sha256(path)
+
+        if sha256 in seen:
+            continue
+
+        seen.add(sha256)
+        pdf_files.append(path)
+
+    return pdf_files
@@ -0,0 +1,163 @@
+import time
+import queue
+import threading
+
+# ===============================
+# SETTINGS
+# ===============================
+
+QUEUE_SIZE = 4       # Items waiting in front of a stage, per worker (0 = unbounded)
+
+_DONE = object()
+
+
+# ===============================
+# STAGES
+# ===============================
+
+class Stage:
+
+    def __init__(self, name, fn, workers=1, fan_out=False, queue_size=None):
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.fan_out = fan_out         # fn returns a list of items for the next stage
+
+        # Bound on the items waiting in front of this stage
+        self.queue_size = QUEUE_SIZE * workers if queue_size is None else queue_size
+
+        self.items = 0
+        self.busy = 0.0
+        self.lock = threading.Lock()
+        self.running = workers
+
+
+# ===============================
+# PIPELINE
+# ===============================
+
+class Pipeline:
+    """
+    Stages connected by bounded queues, each with its own workers.
+
+    Every stage works on a different item at the same time - the first
+    PDF is extracted while the rest are still downloading - and a full
+    queue blocks the stage feeding it, so a fast stage waits for a slow
+    one instead of piling results up in memory. Wall time approaches
+    the slowest stage rather than the sum of all of them.
+
+    `source` is an iterable, or a function called with an emit(item)
+    callback (e.g. download_pdfs(..., on_complete=emit)). A stage's
+    queue_size bounds the queue in front of it (QUEUE_SIZE per worker
+    by default, 0 = unbounded): the first stage after a source that
+    must not be stalled, like a download loop, gets queue_size=0. The
+    pipeline's own queue_size bounds the results waiting for the
+    caller. A stage function returning None drops the item; an
+    exception is reported and drops it too.
+
+    Stages run in threads - for CPU-bound work the stage function hands
+    off to a process pool itself (extraction_engine, ocr_engine).
+    """
+
+    def __init__(self, source, queue_size=QUEUE_SIZE):
+        self.source = source
+        self.queue_size = queue_size
+        self.stages = []
+
+    def stage(self, name, fn, workers=1, fan_out=False, queue_size=None):
+        self.stages.append(Stage(name, fn, workers, fan_out, queue_size))
+        return self
+
+    # -------------------------------
+    # Threads
+    # -------------------------------
+
+    def _feed(self, outbox):
+
+        def emit(item):
+            if item is not None:
+                outbox.put(item)
+
+        try:
+            if callable(self.source):
+                self.source(emit)
+            else:
+                for item in self.source:
+                    emit(item)
+
+        except Exception as e:
+            print(f"❌ Pipeline source failed: {e}")
+
+        finally:
+            outbox.put(_DONE)
+
+    def _work(self, stage, inbox, outbox):
+        while True:
+            item = inbox.get()
+
+            if item is _DONE:
+                inbox.put(_DONE)    # for the other workers of this stage
+                break
+
+            started = time.perf_counter()
+            try:
+                result = stage.fn(item)
+            except Exception as e:
+                print(f"❌ {stage.name} failed: {e}")
+                result = None
+
+            with stage.lock:
+                stage.items += 1
+                stage.busy += time.perf_counter() - started
+
+            if result is None:
+                continue
+
+            for out in (result if stage.fan_out else [result]):
+                outbox.put(out)
+
+        with stage.lock:
+            stage.running -= 1
+            last = stage.running == 0
+
+        if last:
+            outbox.put(_DONE)
+
+    # -------------------------------
+    # Run
+    # -------------------------------
+
+    def run(self):
+        """Yield what the last stage produces, as it is produced."""
+
+        started = time.perf_counter()
+
+        # queues[i] feeds stage i; the last one holds the results
+        queues = [queue.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        queues += [queue.Queue(maxsize=self.queue_size)]
+
+        threads = [threading.Thread(target=self._feed, args=(queues[0],), daemon=True)]
+
+        for i, stage in enumerate(self.stages):
+            threads += [
+                threading.Thread(target=self._work, args=(stage, queues[i], queues[i + 1]), daemon=True)
+                for _ in range(stage.workers)
+            ]
+
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = queues[-1].get()
+                if item is _DONE:
+                    break
+                yield item
+
+        finally:
+            self.report(time.perf_counter() - started)
+
+    def report(self, elapsed):
+        print(f"\n⏱ Pipeline: {elapsed:.1f}s wall")
+        for stage in self.stages:
+            print(f"   {stage.name}: {stage.items} items, {stage.busy:.1f}s busy ({stage.workers} workers)")
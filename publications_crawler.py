@@ -0,0 +1,369 @@
+import os
+import re
+import csv
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from lxml import html as lxml_html
+
+from rate_limiter import install_rate_limiter
+
+# ===============================
+# SETTINGS
+# ===============================
+
+STATE_FILE = "crawler_state.json"
+
+MAX_WORKERS = 8        # Listing pages fetched in parallel
+MAX_PAGES = 200        # Safety cap on pagination per run
+TIMEOUT = 30
+
+# Bumped when extraction changes: pages parsed by an older version are
+# fetched again unconditionally instead of answered with a 304
+PARSER_VERSION = 2
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+}
+
+# Listing pages and the catalog each one feeds
+SOURCES = {
+    "pbs_agri": {
+        "url": "https://www.pbs.gov.pk/agriculture-sector-of-pakistan-importance-role-key-statistics/",
+        "output": "pbs_agri_links.csv",
+        "kind": "links",
+    },
+    "pbs_agri_census": {
+        "url": "https://www.pbs.gov.pk/agriculture-census/",
+        "output": "pbs_agri_census_links.csv",
+        "kind": "links",
+    },
+    "mnfsr_publications": {
+        "url": "https://mnfsr.gov.pk/Publications",
+        "output": "MNFSR_Publications_List.csv",
+        "kind": "publications",
+    },
+}
+
+PAGE_QUERY = re.compile(r"[?&](page|paged|p|pg)=\d+", re.I)
+PAGE_PATH = re.compile(r"/page/\d+/?$", re.I)
+NEXT_TEXT = {"next", "next »", "»", "›", ">", ">>"}
+
+
+# ===============================
+# STATE (frontier + seen URLs)
+# ===============================
+
+def load_state():
+    state = {"frontier": [], "seen": {}, "pages": {}}
+
+    if os.path.exists(STATE_FILE):
+        with open(STATE_FILE, encoding="utf-8") as f:
+            state.update(json.load(f))
+
+    return state
+
+
+def save_state(state):
+    tmp = STATE_FILE + ".tmp"
+
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1)
+
+    os.replace(tmp, STATE_FILE)
+
+
+# ===============================
+# LINK EXTRACTION (lxml)
+# ===============================
+
+def extract_links(content, page_url, encoding=None):
+    """
+    [title, url] for every <a> with an href, in page order. Icon-only
+    links fall back to their title / aria-label attribute, or "".
+    `encoding` is the charset the server declared; without one lxml
+    goes by the page's <meta charset>.
+    """
+
+    parser = lxml_html.HTMLParser(encoding=encoding) if encoding else None
+    root = lxml_html.fromstring(content, parser=parser)
+    links = []
+
+    for a in root.iter("a"):
+        href = (a.get("href") or "").strip()
+        title = a.text_content().strip() or a.get("title") or a.get("aria-label") or ""
+        title = " ".join(title.split())
+
+        if not href:
+            continue
+
+        if not href.startswith("#"):
+            href = urljoin(page_url, href)
+
+        links.append([title, href])
+
+    return links, root
+
+
+def extract_publications(root, page_url):
+    """Title / Date / PDF_Link rows from every table on an MNFSR listing."""
+
+    rows = []
+
+    for tr in root.xpath("//table//tr"):
+        cols = tr.xpath("./td")
+
+        if len(cols) < 4:
+            continue
+
+        title = " ".join(cols[1].text_content().split())
+        date = " ".join(cols[2].text_content().split())
+
+        hrefs = cols[3].xpath(".//a/@href")
+        pdf_link = urljoin(page_url, hrefs[0].strip()) if hrefs else None
+
+        rows.append([title, date, pdf_link])
+
+    return rows
+
+
+def pagination_links(root, page_url, seed_url):
+    """Further pages of the same listing (?page=N, /page/N/, rel=next)."""
+
+    seed = urlsplit(seed_url)
+    seed_path = seed.path.rstrip("/")
+    found = []
+
+    for a in root.iter("a"):
+        href = (a.get("href") or "").strip()
+        if not href or href.startswith(("#", "javascript:", "mailto:")):
+            continue
+
+        url = urljoin(page_url, href).split("#")[0]
+        parts = urlsplit(url)
+
+        if parts.netloc != seed.netloc or not parts.path.rstrip("/").startswith(seed_path):
+            continue
+
+        text = " ".join(a.text_content().split()).lower()
+        rel = (a.get("rel") or "").lower()
+
+        if (
+            "next" in rel
+            or PAGE_QUERY.search(url)
+            or PAGE_PATH.search(parts.path)
+            or text in NEXT_TEXT
+        ):
+            if url != page_url and url not in found:
+                found.append(url)
+
+    return found
+
+
+# ===============================
+# CONDITIONAL FETCH
+# ===============================
+
+def fetch_page(session, url, page_state):
+    headers = {}
+
+    if page_state.get("etag"):
+        headers["If-None-Match"] = page_state["etag"]
+    if page_state.get("last_modified"):
+        headers["If-Modified-Since"] = page_state["last_modified"]
+
+    r = session.get(url, headers=headers, timeout=TIMEOUT)
+
+    if r.status_code == 304:
+        return None
+
+    r.raise_for_status()
+    return r
+
+
+def declared_encoding(response):
+    # requests assumes ISO-8859-1 for any text/html without a charset,
+    # which garbles UTF-8 pages - only a charset actually sent counts
+    content_type = response.headers.get("Content-Type", "").lower()
+    return response.encoding if "charset=" in content_type else None
+
+
+def crawl_page(session, state, source_name, url):
+    source = SOURCES[source_name]
+    page_state = state["pages"].get(url, {})
+
+    # A page parsed by an older extractor has to be read again
+    validators = page_state if page_state.get("parser") == PARSER_VERSION else {}
+
+    try:
+        r = fetch_page(session, url, validators)
+    except requests.RequestException as e:
+        print(f"❌ {url}: {e}")
+        return page_state.get("next", [])
+
+    if r is None:
+        # Unchanged listing: reuse the links recorded last time
+        print(f"✔ Unchanged: {url}")
+        return page_state.get("next", [])
+
+    links, root = extract_links(r.content, url, declared_encoding(r))
+
+    page_state = {
+        "source": source_name,
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+        "links": links,
+        "next": pagination_links(root, url, source["url"]),
+        "fetched": time.time(),
+        "parser": PARSER_VERSION,
+    }
+
+    if source["kind"] == "publications":
+        page_state["rows"] = extract_publications(root, url)
+
+    state["pages"][url] = page_state
+    print(f"📄 Parsed: {url} ({len(links)} links)")
+
+    return page_state["next"]
+
+
+# ===============================
+# CRAWL
+# ===============================
+
+def crawl(source_names=None):
+    """
+    Walk every listing page (and its pagination) of the chosen sources,
+    rewrite their catalogs and return {source: [new [title, url], ...]}.
+    """
+
+    source_names = source_names or list(SOURCES)
+    state = load_state()
+
+    session = install_rate_limiter(requests.Session())
+    session.headers.update(HEADERS)
+
+    # Resume an interrupted crawl, then always revisit the seeds
+    frontier = [
+        (name, url) for name, url in state["frontier"] if name in source_names
+    ]
+    frontier += [(name, SOURCES[name]["url"]) for name in source_names]
+
+    visited = set()
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+
+        while frontier and len(visited) < MAX_PAGES:
+
+            wave = []
+            for name, url in frontier:
+                if url not in visited:
+                    visited.add(url)
+                    wave.append((name, url))
+
+            state["frontier"] = [list(job) for job in wave]
+            save_state(state)
+
+            results = executor.map(
+                lambda job: crawl_page(session, state, job[0], job[1]),
+                wave
+            )
+
+            frontier = [
+                (name, next_url)
+                for (name, _), next_urls in zip(wave, results)
+                for next_url in next_urls
+                if next_url not in visited
+            ]
+
+    state["frontier"] = [list(job) for job in frontier]
+
+    # A finished crawl reached every page still linked from the seeds;
+    # the rest (e.g. a pagination page that went away) leave the catalog
+    if not frontier:
+        for url, page in list(state["pages"].items()):
+            if page.get("source") in source_names and url not in visited:
+                print(f"🗑 Dropped: {url}")
+                del state["pages"][url]
+
+    new_links = {}
+
+    for name in source_names:
+        new_links[name] = record_new_links(state, name)
+        write_catalog(state, name)
+
+    save_state(state)
+
+    return new_links
+
+
+def record_new_links(state, source_name):
+    new = []
+
+    for title, url in catalog_links(state, source_name):
+        if url not in state["seen"]:
+            state["seen"][url] = {"source": source_name, "title": title, "first_seen": time.time()}
+            new.append([title, url])
+
+    print(f"🆕 {source_name}: {len(new)} new links")
+    for title, url in new:
+        print(f"   + {title}: {url}")
+
+    return new
+
+
+# ===============================
+# CATALOGS
+# ===============================
+
+def _source_pages(state, source_name):
+    return [
+        page for page in state["pages"].values()
+        if page.get("source") == source_name
+    ]
+
+
+def catalog_links(state, source_name):
+    return [link for page in _source_pages(state, source_name) for link in page["links"]]
+
+
+def catalog_publications(state, source_name):
+    return [row for page in _source_pages(state, source_name) for row in page.get("rows", [])]
+
+
+def write_catalog(state, source_name):
+    source = SOURCES[source_name]
+
+    if source["kind"] == "publications":
+        header = ["Title", "Date", "PDF_Link"]
+        rows = catalog_publications(state, source_name)
+    else:
+        header = ["title", "url"]
+        rows = catalog_links(state, source_name)
+
+    with open(source["output"], "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+    print(f"✅ Saved {len(rows)} rows to {source['output']}")
+
+
+def pdf_links(source_name, state=None):
+    """Unique PDF URLs of a source, in catalog order."""
+
+    state = state or load_state()
+
+    if SOURCES[source_name]["kind"] == "publications":
+        urls = [row[2] for row in catalog_publications(state, source_name) if row[2]]
+    else:
+        urls = [url for _, url in catalog_links(state, source_name)]
+
+    return list(dict.fromkeys(url for url in urls if ".pdf" in url.lower()))
+
+
+if __name__ == "__main__":
+    crawl()
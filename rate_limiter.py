@@ -0,0 +1,208 @@
+import time
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+from http_fetch import resolve_url
+
+# ===============================
+# SETTINGS
+# ===============================
+
+INITIAL_RATE = 4.0     # Requests per second to start with
+MIN_RATE = 0.2         # Never slower than one request per 5s
+MAX_RATE = 25.0        # Never faster than this
+BURST = 8              # Tokens a quiet host can bank
+
+SLOW_START = 1.5       # Rate multiplier per success until the first throttle
+RATE_INCREASE = 0.5    # Added to the rate after each success from then on
+RATE_DECREASE = 0.5    # Rate multiplier after a throttling response
+
+THROTTLE_STATUS = (429, 503)
+MAX_RETRIES = 5
+MAX_RETRY_AFTER = 120  # Seconds - ignore absurd Retry-After values
+
+
+# ===============================
+# TOKEN BUCKET (ONE PER HOST)
+# ===============================
+
+class HostLimiter:
+    """
+    Token bucket whose rate adapts to the server: it grows
+    multiplicatively until the host first pushes back, then additively
+    on every success (a 2xx/3xx answer); 429/503 halve it, and
+    Retry-After pauses the host for as long as asked. Other errors
+    leave the rate as it is.
+    """
+
+    def __init__(self, rate=INITIAL_RATE, burst=BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.slow_start = True
+        self.lock = threading.Lock()
+
+    def try_acquire(self):
+        """
+        Take a token if one is available and return 0, otherwise return
+        how long to sleep before trying again. Waiters re-check instead
+        of booking a slot up front, so a rate increase helps them too.
+        """
+
+        with self.lock:
+            now = time.monotonic()
+
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            if now < self.blocked_until:
+                return self.blocked_until - now
+
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+
+            return (1 - self.tokens) / self.rate
+
+    def on_success(self):
+        with self.lock:
+            if self.slow_start:
+                self.rate = min(MAX_RATE, self.rate * SLOW_START)
+            else:
+                self.rate = min(MAX_RATE, self.rate + RATE_INCREASE)
+
+    def on_throttle(self, retry_after=None):
+        with self.lock:
+            self.slow_start = False
+            self.rate = max(MIN_RATE, self.rate * RATE_DECREASE)
+            self.tokens = min(self.tokens, 0.0)
+
+            if retry_after:
+                pause = min(retry_after, MAX_RETRY_AFTER)
+                self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+
+
+def served(status):
+    # A 500 or 404 says nothing about how fast the host can be asked
+    return 200 <= status < 400
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(url):
+    host = urlsplit(url).netloc.lower()
+
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = HostLimiter()
+        return _limiters[host]
+
+
+def parse_retry_after(value):
+    """Retry-After as seconds (it may be a number or an HTTP date)."""
+
+    if not value:
+        return None
+
+    value = value.strip()
+
+    if value.isdigit():
+        return float(value)
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# ===============================
+# REQUESTS SESSION INTEGRATION
+# ===============================
+
+class RateLimitAdapter(HTTPAdapter):
+    """
+    Transport adapter that waits for a token before every request and
+    retries throttled responses after backing off.
+    """
+
+    def send(self, request, **kwargs):
+        limiter = limiter_for(request.url)
+        request.url = resolve_url(request.url)
+
+        for attempt in range(MAX_RETRIES + 1):
+
+            while (wait := limiter.try_acquire()) > 0:
+                time.sleep(wait)
+
+            response = super().send(request, **kwargs)
+
+            if response.status_code not in THROTTLE_STATUS:
+                if served(response.status_code):
+                    limiter.on_success()
+                return response
+
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            limiter.on_throttle(retry_after)
+
+            if attempt < MAX_RETRIES:
+                print(f"⏳ Throttled ({response.status_code}), "
+                      f"rate now {limiter.rate:.2f}/s: {request.url}")
+                response.close()
+
+        return response
+
+
+def install_rate_limiter(session):
+    adapter = RateLimitAdapter()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# ===============================
+# ASYNCIO INTEGRATION
+# ===============================
+
+async def wait_for_token(url):
+    limiter = limiter_for(url)
+
+    while (wait := limiter.try_acquire()) > 0:
+        await asyncio.sleep(wait)
+
+
+async def limited_get(session, url, **kwargs):
+    """
+    aiohttp GET through the host's token bucket, retrying throttled
+    responses. Returns (status, body bytes).
+    """
+
+    limiter = limiter_for(url)
+
+    for attempt in range(MAX_RETRIES + 1):
+
+        await wait_for_token(url)
+
+        async with session.get(resolve_url(url), **kwargs) as r:
+            body = await r.read()
+            status = r.status
+            retry_after = parse_retry_after(r.headers.get("Retry-After"))
+
+        if status not in THROTTLE_STATUS:
+            if served(status):
+                limiter.on_success()
+            return status, body
+
+        limiter.on_throttle(retry_after)
+
+        if attempt < MAX_RETRIES:
+            print(f"⏳ Throttled ({status}), rate now {limiter.rate:.2f}/s: {url}")
+
+    return status, body
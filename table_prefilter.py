@@ -0,0 +1,191 @@
+import re
+from collections import defaultdict
+
+import numpy as np
+
+from page_classifier import SCANNED, TEXT, classify_pdf, pages_labelled
+
+# ===============================
+# SETTINGS
+# ===============================
+
+TABLE_SCORE = 0.4        # Pages scoring at least this go to the table extractors
+
+# Text layer
+DIGITS_FULL = 0.25       # Digit share of the text that counts as fully "numeric"
+COLUMNS_FULL = 4         # Aligned columns that count as fully "tabular"
+RULINGS_FULL = 12        # Line / rectangle operators that count as fully "ruled"
+ALIGN_TOLERANCE = 3.0    # Points two run edges may differ and still line up
+MIN_COLUMN_ROWS = 3      # Lines a column edge must recur on
+WORD_GAP = 1.0           # Run gap (in line heights) that separates two cells
+
+# Scanned pages (low-resolution raster)
+RASTER_DPI = 50
+INK_LEVEL = 128          # Grey level below which a pixel is ink
+RULE_FILL = 0.5          # Share of a row / column that must be ink to be a ruling
+RULES_FULL = 6
+GUTTERS_FULL = 3
+MIN_GUTTER_PX = 3
+
+LINE_OPS = re.compile(rb"\s(?:re|l)\s")
+
+
+# ===============================
+# TEXT-LAYER FEATURES
+# ===============================
+
+def _segments(rects):
+    """
+    Text runs merged into the stretches of a line they belong to: runs
+    closer than WORD_GAP line-heights are one phrase, not two cells.
+    """
+
+    lines = defaultdict(list)
+    for left, bottom, right, top in rects:
+        lines[round(bottom)].append((left, right, max(top - bottom, 1.0)))
+
+    segments = []
+
+    for y, runs in lines.items():
+        runs.sort()
+        left, right, height = runs[0]
+
+        for run_left, run_right, run_height in runs[1:]:
+            if run_left - right < WORD_GAP * max(height, run_height):
+                right = max(right, run_right)
+                height = max(height, run_height)
+            else:
+                segments.append((left, y, right))
+                left, right, height = run_left, run_right, run_height
+
+        segments.append((left, y, right))
+
+    return segments
+
+
+def _aligned_columns(rects):
+    """Left or right segment edges that recur on MIN_COLUMN_ROWS different lines."""
+
+    segments = _segments(rects)
+    best = 0
+
+    for edge in (0, 2):   # left edges, then right edges (right-aligned numbers)
+        lines_at = defaultdict(set)
+
+        for segment in segments:
+            lines_at[round(segment[edge] / ALIGN_TOLERANCE)].add(segment[1])
+
+        best = max(best, sum(1 for lines in lines_at.values() if len(lines) >= MIN_COLUMN_ROWS))
+
+    return best
+
+
+def text_features(doc, number):
+    text, rects = doc.text_runs(number)
+
+    visible = [c for c in text if not c.isspace()]
+    digits = sum(c.isdigit() for c in visible)
+
+    contents = doc.reader.pages[number - 1].get_contents()
+    data = contents.get_data() if contents is not None else b""
+
+    return {
+        "digit_ratio": digits / len(visible) if visible else 0.0,
+        "columns": _aligned_columns(rects),
+        "rulings": len(LINE_OPS.findall(data)),
+    }
+
+
+def text_score(features):
+    return (
+        0.35 * min(features["digit_ratio"] / DIGITS_FULL, 1.0)
+        + 0.45 * min(features["columns"] / COLUMNS_FULL, 1.0)
+        + 0.20 * min(features["rulings"] / RULINGS_FULL, 1.0)
+    )
+
+
+# ===============================
+# RASTER FEATURES (SCANNED PAGES)
+# ===============================
+
+def _runs(mask):
+    """Number of separate True runs in a 1-D mask."""
+
+    if not mask.any():
+        return 0
+    return int(mask[0]) + int(np.count_nonzero(mask[1:] & ~mask[:-1]))
+
+
+def _true_spans(mask):
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+    return zip(edges[::2], edges[1::2])
+
+
+def raster_features(doc, number):
+    ink = np.asarray(doc.raster(number, dpi=RASTER_DPI, colorspace="L")) < INK_LEVEL
+
+    rows = ink.mean(axis=1)
+    cols = ink.mean(axis=0)
+
+    # Blank vertical gutters between inked columns, inside the ink's extent
+    inked = np.flatnonzero(cols > 0)
+    gutters = 0
+    if inked.size:
+        span = cols[inked[0]:inked[-1] + 1] == 0
+        gutters = sum(
+            1 for start, end in _true_spans(span) if end - start >= MIN_GUTTER_PX
+        )
+
+    return {
+        "h_rules": _runs(rows >= RULE_FILL),
+        "v_rules": _runs(cols >= RULE_FILL * 0.6),
+        "gutters": gutters,
+    }
+
+
+def raster_score(features):
+    return (
+        0.4 * min(features["h_rules"] / RULES_FULL, 1.0)
+        + 0.2 * min(features["v_rules"] / RULES_FULL, 1.0)
+        + 0.4 * min(features["gutters"] / GUTTERS_FULL, 1.0)
+    )
+
+
+# ===============================
+# PAGE SELECTION
+# ===============================
+
+def score_page(doc, number, label=TEXT):
+    """0..1 likelihood that the page holds a table."""
+
+    try:
+        if label == SCANNED:
+            return raster_score(raster_features(doc, number))
+        return text_score(text_features(doc, number))
+    except Exception as e:
+        # Rather extract a page for nothing than miss its table
+        print(f"   ⚠ Page {number} not scored ({e}) → kept")
+        return 1.0
+
+
+def table_pages(doc, threshold=TABLE_SCORE):
+    """
+    (text pages, scanned pages) of the whole document that are likely
+    to hold a table - the only pages worth handing to Camelot,
+    pdfplumber, tabula or OCR.
+    """
+
+    labels = classify_pdf(doc)
+
+    text_pages = [
+        page for page in pages_labelled(labels, TEXT)
+        if score_page(doc, page, TEXT) >= threshold
+    ]
+    scanned_pages = [
+        page for page in pages_labelled(labels, SCANNED)
+        if score_page(doc, page, SCANNED) >= threshold
+    ]
+
+    print(f"   🔎 Table candidates: {len(text_pages) + len(scanned_pages)} of {len(labels)} pages")
+
+    return text_pages, scanned_pages
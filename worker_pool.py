@@ -0,0 +1,63 @@
+import os
+import warnings
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import page_renderer
+
+# ===============================
+# SETTINGS
+# ===============================
+
+WORKERS = os.cpu_count() or 1   # One process per core, for Camelot and OCR together
+THREADS_PER_WORKER = 1          # OpenMP threads per process (OMP_THREAD_LIMIT)
+
+
+def _init_worker():
+    # Read by OpenMP when libtesseract is loaded, on this worker's first
+    # OCR task: Tesseract's own threads would fight the other workers
+    os.environ["OMP_THREAD_LIMIT"] = str(THREADS_PER_WORKER)
+
+    warnings.filterwarnings("ignore")
+
+    # Every page is rendered for one task only: keep no rasters around
+    page_renderer.CACHE_MB = 0
+
+
+# ===============================
+# SHARED POOL
+# ===============================
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def worker_pool(workers=WORKERS):
+    """
+    The process pool Camelot pages and OCR pages share, kept for the
+    life of the program so workers stay warm across documents. One pool
+    for both means a pipeline extracting one PDF while OCR'ing another
+    still runs one process per core, not two.
+
+    Sized by the largest `workers` asked for. Started with "spawn", so
+    creating it lazily from a pipeline thread never forks a copy of
+    that thread's locks.
+    """
+
+    global _pool, _pool_workers
+
+    with _pool_lock:
+        if _pool is None or workers > _pool_workers:
+            if _pool is not None:
+                _pool.shutdown(wait=True)
+
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            _pool_workers = workers
+
+        return _pool